@@ -2,16 +2,51 @@ import sys
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QComboBox, QLineEdit, QTableWidget, QTableWidgetItem, QMessageBox,
-    QStackedWidget, QGroupBox, QFormLayout, QSpinBox, QListWidget, QTimeEdit
+    QStackedWidget, QGroupBox, QFormLayout, QSpinBox, QListWidget, QTimeEdit,
+    QGraphicsView, QGraphicsScene, QGraphicsRectItem, QGraphicsSimpleTextItem, QGraphicsItem,
+    QFileDialog
 )
-from PyQt5.QtGui import QFont, QPixmap, QPalette, QBrush, QColor, QLinearGradient
-from PyQt5.QtCore import Qt, QTime
-from collections import defaultdict
+from PyQt5.QtGui import QFont, QPixmap, QPalette, QBrush, QColor, QLinearGradient, QPen
+from PyQt5.QtCore import Qt, QTime, QPointF, QRectF
+from collections import Counter, OrderedDict, defaultdict, deque, namedtuple
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import islice
+from time import perf_counter
+from types import MappingProxyType
+import asyncio
+import copy
+import csv
+import hashlib
+import heapq
+import json
+import mmap
+import os
 import random
+import statistics
+import struct
+import threading
+import tracemalloc
+
+DEFAULT_BRANCH = "Main"
+
 
 # --------------------- Service Management -------------------------
+class ServiceSnapshot(namedtuple("ServiceSnapshot", "version services roles")):
+    # Immutable, versioned view of a catalogue; safe to read from any thread
+    __slots__ = ()
+
+    def get_service(self, name):
+        return self.services.get(name)
+
+    def get_service_role(self, name):
+        return self.roles.get(name, ServiceManager._default_role)
+
+
 class ServiceManager:
-    _services = {
+    _default_services = {
         'Hair Wash': {"cost": 500, "duration": 4, "priority": 3},
         'Haircut': {"cost": 800, "duration": 6, "priority": 2},
         'Manicure': {"cost": 300, "duration": 3, "priority": 3},
@@ -20,36 +55,166 @@ class ServiceManager:
         'Mehndi Design': {"cost": 1200, "duration": 7, "priority": 2}
     }
 
-    @classmethod
-    def get_services(cls):
-        return cls._services
-
-    @classmethod
-    def get_service(cls, name):
-        return cls._services.get(name)
-
-    @classmethod
-    def add_service(cls, name, cost, duration, priority):
-        cls._services[name] = {"cost": cost, "duration": duration, "priority": priority}
+    # Staff role that performs each service
+    _default_service_roles = {
+        'Hair Wash': 'Hair Stylist',
+        'Haircut': 'Hair Stylist',
+        'Manicure': 'Waxing/Threading Expert',
+        'VIP Facial': 'Makeup Artist',
+        'Bridal Makeup': 'Makeup Artist',
+        'Mehndi Design': 'Mehndi Artist'
+    }
+    _default_role = 'Hair Stylist'
+
+    def __init__(self, services=None, service_roles=None):
+        # Each instance owns its catalogue, so branches never share mutable state
+        services = self._default_services if services is None else services
+        service_roles = self._default_service_roles if service_roles is None else service_roles
+        self.__setstate__({"version": 0, "services": services, "roles": service_roles})
+
+    # Readers take the current snapshot without locking; writers copy it,
+    # change the copy and publish it as the next version in one assignment.
+    def __getstate__(self):
+        snapshot = self._snapshot
+        return {"version": snapshot.version,
+                "services": {name: dict(details) for name, details in snapshot.services.items()},
+                "roles": dict(snapshot.roles)}
+
+    def __setstate__(self, state):
+        self._write_lock = threading.Lock()
+        self._snapshot = ServiceSnapshot(
+            state["version"],
+            MappingProxyType({name: MappingProxyType(dict(details)) for name, details in state["services"].items()}),
+            MappingProxyType(dict(state["roles"])))
+
+    def _publish(self, services, roles):
+        self._snapshot = ServiceSnapshot(self._snapshot.version + 1,
+                                         MappingProxyType(services), MappingProxyType(roles))
+
+    def snapshot(self):
+        return self._snapshot
+
+    def get_services(self):
+        return self._snapshot.services
+
+    def get_service(self, name):
+        return self._snapshot.get_service(name)
+
+    def get_service_role(self, name):
+        return self._snapshot.get_service_role(name)
+
+    def add_service(self, name, cost, duration, priority, role=None):
+        with self._write_lock:
+            services = dict(self._snapshot.services)
+            roles = dict(self._snapshot.roles)
+            services[name] = MappingProxyType({"cost": cost, "duration": duration, "priority": priority})
+            if role:
+                roles[name] = role
+            self._publish(services, roles)
+
+    def update_service(self, name, cost, duration, priority):
+        with self._write_lock:
+            if name in self._snapshot.services:
+                services = dict(self._snapshot.services)
+                services[name] = MappingProxyType({"cost": cost, "duration": duration, "priority": priority})
+                self._publish(services, dict(self._snapshot.roles))
+
+    def delete_service(self, name):
+        with self._write_lock:
+            if name in self._snapshot.services:
+                services = dict(self._snapshot.services)
+                roles = dict(self._snapshot.roles)
+                del services[name]
+                roles.pop(name, None)
+                self._publish(services, roles)
+
+    def get_service_names(self):
+        return list(self._snapshot.services.keys())
+
+    # Bulk import/export. Files are CSV with a name,cost,duration,priority,role
+    # header, JSON Lines (.jsonl, one service object per line) or a JSON array.
+    _FIELDS = ("name", "cost", "duration", "priority", "role")
 
     @classmethod
-    def update_service(cls, name, cost, duration, priority):
-        if name in cls._services:
-            cls._services[name] = {"cost": cost, "duration": duration, "priority": priority}
+    def read_service_file(cls, path):
+        # Yields (name, details, role) one row at a time
+        with open(path, newline="", encoding="utf-8") as file:
+            if path.lower().endswith(".csv"):
+                rows = csv.DictReader(file)
+            elif path.lower().endswith(".jsonl"):
+                rows = (json.loads(line) for line in file if line.strip())
+            else:
+                rows = json.load(file)
+            for line, row in enumerate(rows, 1):
+                try:
+                    name = str(row["name"]).strip()
+                    priority = row.get("priority")
+                    details = {"cost": int(row["cost"]), "duration": int(row["duration"]),
+                               "priority": 3 if priority in (None, "") else int(priority)}  # 0 is a priority
+                except (KeyError, TypeError, ValueError) as error:
+                    raise ValueError(f"{path}: bad service on row {line}: {error}") from None
+                if not name:
+                    raise ValueError(f"{path}: service without a name on row {line}")
+                if details["cost"] < 0 or details["priority"] < 0 or details["duration"] <= 0:
+                    raise ValueError(f"{path}: cost and priority can't be negative and duration must be "
+                                     f"positive (row {line}, {name!r})")
+                yield name, details, (row.get("role") or "").strip() or None
+
+    def import_services(self, rows, replace=False):
+        # Diffs rows against the catalogue and publishes the result as one
+        # new version; with replace, services missing from rows are removed.
+        # A name repeated in rows counts once, its last row winning.
+        # Returns {"added": [...], "updated": [...], "removed": [...], "unchanged": n}
+        latest = {name: (details, role) for name, details, role in rows}
+        with self._write_lock:
+            current = self._snapshot
+            services = dict(current.services)
+            roles = dict(current.roles)
+            added, updated, seen = [], [], set(latest)
+            unchanged = 0
+            for name, (details, role) in latest.items():
+                old = current.services.get(name)
+                if old is None:
+                    added.append(name)
+                elif dict(old) != details or (role and role != current.get_service_role(name)):
+                    updated.append(name)
+                else:
+                    unchanged += 1
+                    continue
+                services[name] = MappingProxyType(details)
+                if role:
+                    roles[name] = role
+            removed = [name for name in current.services if name not in seen] if replace else []
+            for name in removed:
+                del services[name]
+                roles.pop(name, None)
+            if added or updated or removed:
+                self._publish(services, roles)
+        return {"added": added, "updated": updated, "removed": removed, "unchanged": unchanged}
+
+    def export_services(self, path):
+        snapshot = self._snapshot
+        rows = ({"name": name, **details, "role": snapshot.get_service_role(name)}
+                for name, details in snapshot.services.items())
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            if path.lower().endswith(".csv"):
+                writer = csv.DictWriter(file, self._FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            elif path.lower().endswith(".jsonl"):
+                file.writelines(json.dumps(row) + "\n" for row in rows)
+            else:
+                json.dump(list(rows), file, indent=1)
+        return len(snapshot.services)
 
-    @classmethod
-    def delete_service(cls, name):
-        if name in cls._services:
-            del cls._services[name]
 
-    @classmethod
-    def get_service_names(cls):
-        return list(cls._services.keys())
+# --------------------- Staff Management -------------------------
+StaffSnapshot = namedtuple("StaffSnapshot", "version staff member_shifts shift_start shift_duration "
+                                            "break_duration breaks_per_shift")
 
 
-# --------------------- Staff Management -------------------------
 class StaffManager:
-    _staff = {
+    _default_staff = {
         'Hair Stylist': ["Sara", "Mehak", "Aaima"],
         'Makeup Artist': ["Ayesha", "Farheen", "Farzeen"],
         'Mehndi Artist': ["Eshah", "Maryam"],
@@ -58,120 +223,394 @@ class StaffManager:
         'Massage Expert': ["Umaima", "Darkshan"]
     }
 
-    _shift_duration = 8  # hours
-    _break_duration = 0.5  # hours (30 minutes)
-    _quantum = 0.5  # hours (30 minutes)
-    _breaks_per_shift = 2  # Each staff gets 2 breaks per shift
-
-    @classmethod
-    def get_staff_roles(cls):
-        return list(cls._staff.keys())
-
-    @classmethod
-    def get_staff_members(cls, role):
-        return cls._staff.get(role, [])
-
-    @classmethod
-    def add_staff_member(cls, role, name):
-        if role in cls._staff:
-            if name not in cls._staff[role]:
-                cls._staff[role].append(name)
-                return True
-        else:
-            cls._staff[role] = [name]
+    # Roster slots are flat (start, end) pairs alternating Work/Break:
+    # Work, Break, Work, Break, ..., Work. Unused pairs hold _NO_SLOT.
+    _SLOT_KINDS = ("Work", "Break")
+    _NO_SLOT = 0xFFFF
+
+    # Clock label for every minute of a week, so rendering is a table lookup
+    # (midnight is "12:00 AM", noon is "12:00 PM")
+    _TIME_LABELS = tuple(f"{(minute // 60) % 12 or 12:02d}:{minute % 60:02d} "
+                         f"{'AM' if (minute // 60) % 24 < 12 else 'PM'}"
+                         for minute in range(7 * 24 * 60))
+
+    def __init__(self, staff=None):
+        staff = self._default_staff if staff is None else staff
+        self._quantum = 0.5  # hours (30 minutes)
+        self.__setstate__({
+            "version": 0,
+            "staff": staff,
+            "member_shifts": {},  # name -> {"start", "duration", "days_off"} overrides
+            "shift_start": 9 * 60,  # minutes after midnight (9:00 AM)
+            "shift_duration": 8,  # hours
+            "break_duration": 0.5,  # hours (30 minutes)
+            "breaks_per_shift": 2,  # Each staff gets 2 breaks per shift
+        })
+
+    # Same copy-on-write scheme as ServiceManager: rosters are computed from
+    # one snapshot, so edits made meanwhile never produce a torn schedule.
+    def __getstate__(self):
+        state = self._snapshot._asdict()
+        state["staff"] = {role: list(members) for role, members in state["staff"].items()}
+        state["member_shifts"] = {name: dict(shift) for name, shift in state["member_shifts"].items()}
+        state["quantum"] = self._quantum
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        self._quantum = state.pop("quantum", getattr(self, "_quantum", 0.5))
+        self._write_lock = threading.Lock()
+        state["staff"] = MappingProxyType({role: tuple(members) for role, members in state["staff"].items()})
+        state["member_shifts"] = MappingProxyType({name: MappingProxyType(dict(shift))
+                                                   for name, shift in state["member_shifts"].items()})
+        self._snapshot = StaffSnapshot(**state)
+
+    def _publish(self, **changes):
+        for key in ("staff", "member_shifts"):
+            if key in changes:
+                changes[key] = MappingProxyType(changes[key])
+        self._snapshot = self._snapshot._replace(version=self._snapshot.version + 1, **changes)
+
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def shift_start(self):
+        return self._snapshot.shift_start
+
+    @property
+    def shift_duration(self):
+        return self._snapshot.shift_duration
+
+    @staticmethod
+    def _check_shift(duration, breaks_per_shift):
+        # Every roster consumer divides the shift into breaks_per_shift + 1 work periods
+        if not isinstance(breaks_per_shift, int) or breaks_per_shift < 1:
+            raise ValueError(f"Breaks per shift must be a whole number of at least 1, not {breaks_per_shift!r}")
+        if duration <= 0 or int(duration * 60) // (breaks_per_shift + 1) < 1:
+            raise ValueError(f"A {duration} hour shift is too short for {breaks_per_shift} break(s)")
+
+    def set_shift_settings(self, start=None, duration=None, break_duration=None, breaks_per_shift=None):
+        changes = {"shift_start": start, "shift_duration": duration,
+                   "break_duration": break_duration, "breaks_per_shift": breaks_per_shift}
+        changes = {key: value for key, value in changes.items() if value is not None}
+        with self._write_lock:
+            settings = self._snapshot._replace(**changes)
+            if settings.shift_start < 0 or settings.break_duration < 0:
+                raise ValueError("Shift start and break duration can't be negative")
+            self._check_shift(settings.shift_duration, settings.breaks_per_shift)
+            for shift in settings.member_shifts.values():
+                if shift["duration"] is not None:
+                    self._check_shift(shift["duration"], settings.breaks_per_shift)
+            self._publish(**changes)
+
+    def get_staff_roles(self):
+        return list(self._snapshot.staff.keys())
+
+    def get_staff_members(self, role):
+        return list(self._snapshot.staff.get(role, ()))
+
+    def count_staff(self, role):
+        return len(self._snapshot.staff.get(role, ()))
+
+    def add_staff_member(self, role, name):
+        with self._write_lock:
+            members = self._snapshot.staff.get(role, ())
+            if name in members:
+                return False
+            staff = dict(self._snapshot.staff)
+            staff[role] = members + (name,)
+            self._publish(staff=staff)
             return True
-        return False
 
-    @classmethod
-    def remove_staff_member(cls, role, name):
-        if role in cls._staff and name in cls._staff[role]:
-            cls._staff[role].remove(name)
+    def remove_staff_member(self, role, name):
+        with self._write_lock:
+            members = self._snapshot.staff.get(role, ())
+            if name not in members:
+                return False
+            staff = dict(self._snapshot.staff)
+            staff[role] = tuple(member for member in members if member != name)
+            member_shifts = dict(self._snapshot.member_shifts)
+            if not any(name in others for others in staff.values()):
+                member_shifts.pop(name, None)
+            self._publish(staff=staff, member_shifts=member_shifts)
             return True
-        return False
 
-    @classmethod
-    def generate_schedule(cls):
+    def set_member_shift(self, name, start=None, duration=None, days_off=()):
+        # start in minutes after midnight, duration in hours, days_off as weekday numbers (Mon=0)
+        with self._write_lock:
+            if start is not None and start < 0:
+                raise ValueError("Shift start can't be negative")
+            if duration is not None:
+                self._check_shift(duration, self._snapshot.breaks_per_shift)
+            member_shifts = dict(self._snapshot.member_shifts)
+            member_shifts[name] = MappingProxyType({"start": start, "duration": duration,
+                                                    "days_off": frozenset(days_off)})
+            self._publish(member_shifts=member_shifts)
+
+    def clear_member_shift(self, name):
+        with self._write_lock:
+            if name in self._snapshot.member_shifts:
+                member_shifts = dict(self._snapshot.member_shifts)
+                del member_shifts[name]
+                self._publish(member_shifts=member_shifts)
+
+    def get_member_shift(self, name, snapshot=None):
+        snapshot = snapshot or self._snapshot
+        override = snapshot.member_shifts.get(name, {})
+        start = override.get("start")
+        duration = override.get("duration")
+        return (snapshot.shift_start if start is None else start,
+                snapshot.shift_duration if duration is None else duration,
+                override.get("days_off", frozenset()))
+
+    def _role_slots(self, snapshot, indices, starts, durations, count):
+        # Computes every member's slots at once, one column (slot pair) at a
+        # time across the whole role, into a dense rows x width array.
+        breaks = snapshot.breaks_per_shift
+        width = 2 * (2 * breaks + 1)
+        no_slot = self._NO_SLOT
+        slots = array('H', [no_slot]) * (len(indices) * width)
+        if not indices:
+            return slots
+
+        def fill(pair, present, column_start, column_end):
+            slots[2 * pair::width] = array('H', [s if p else no_slot for s, p in zip(column_start, present)])
+            slots[2 * pair + 1::width] = array('H', [e if p else no_slot for e, p in zip(column_end, present)])
+
+        break_minutes = int(snapshot.break_duration * 60)
+        shift_ends = [start + int(duration * 60) for start, duration in zip(starts, durations)]
+
+        # Calculate break intervals and staggered first-break offsets by index
+        intervals = [(end - start) // (breaks + 1) for start, end in zip(starts, shift_ends)]
+        offsets = [interval if index == 0 else (index * (interval // max(1, count))) % interval
+                   for index, interval in zip(indices, intervals)]
+
+        # First work period and first break
+        first_breaks = [start + offset for start, offset in zip(starts, offsets)]
+        current = [first_break + break_minutes for first_break in first_breaks]
+        fill(0, [offset > 0 for offset in offsets], starts, first_breaks)
+        fill(1, [True] * len(indices), first_breaks, current)
+
+        # Remaining work periods and breaks
+        remaining = [(end - cur) // breaks for cur, end in zip(current, shift_ends)]
+        for i in range(1, breaks + 1):
+            work_ends = [cur + rem for cur, rem in zip(current, remaining)]
+            fill(2 * i, [rem > 0 for rem in remaining], current, work_ends)
+
+            if i < breaks:
+                has_break = [work_end < end for work_end, end in zip(work_ends, shift_ends)]
+                break_ends = [work_end + break_minutes for work_end in work_ends]
+                fill(2 * i + 1, has_break, work_ends, break_ends)
+                current = [b_end if p else cur for b_end, p, cur in zip(break_ends, has_break, current)]
+
+        return slots
+
+    @staticmethod
+    def iter_role_roster(role_roster):
+        members, slots = role_roster
+        width = len(slots) // len(members) if members else 0
+        for row, member in enumerate(members):
+            yield member, slots[row * width:(row + 1) * width]
+
+    def slots_to_shifts(self, slots):
+        shifts = []
+        for pos in range(0, len(slots), 2):
+            if slots[pos] != self._NO_SLOT:
+                shifts.append((self._SLOT_KINDS[(pos // 2) % 2], slots[pos], slots[pos + 1]))
+        return shifts
+
+    def roster_for_day(self, day, staff=None):
+        # {role: (members, slots)} where slots holds one row per working member
+        snapshot = self._snapshot
+        weekday = day.weekday()
+        roster = {}
+
+        for role, members in (snapshot.staff if staff is None else staff).items():
+            if not members:  # Skip if no staff in this role
+                continue
+
+            working, indices, starts, durations = [], [], [], []
+            for index, member in enumerate(members):
+                start, duration, days_off = self.get_member_shift(member, snapshot)
+                if weekday in days_off:
+                    continue
+                working.append(member)
+                indices.append(index)
+                starts.append(start)
+                durations.append(duration)
+
+            roster[role] = (tuple(working), self._role_slots(snapshot, indices, starts, durations, len(members)))
+
+        return roster
+
+    def generate_roster(self, start_date, end_date):
+        # Streams (day, roster_for_day(day)) one day at a time, end_date inclusive
+        day = start_date
+        while day <= end_date:
+            yield day, self.roster_for_day(day)
+            day += timedelta(days=1)
+
+    def generate_schedule(self, day=None):
+        # Same shifts as roster_for_day, built one member at a time straight
+        # into tuples; going through the dense slot array and back is slower.
+        # tests/test_staff_schedule.py keeps this, _role_slots and the original
+        # loop in step.
+        snapshot = self._snapshot
+        weekday = (day or date.today()).weekday()
+        breaks = snapshot.breaks_per_shift
+        break_minutes = int(snapshot.break_duration * 60)
+        member_shifts = snapshot.member_shifts
         schedule = {}
-        shift_start_hour = 9  # 9:00 AM
-        shift_end_hour = 17  # 5:00 PM
 
-        for role, members in cls._staff.items():
+        for role, members in snapshot.staff.items():
             if not members:  # Skip if no staff in this role
                 continue
 
             role_schedule = {}
+            count = len(members)
+            for index, member in enumerate(members):
+                if member in member_shifts:
+                    start, duration, days_off = self.get_member_shift(member, snapshot)
+                    if weekday in days_off:
+                        continue
+                else:
+                    start, duration = snapshot.shift_start, snapshot.shift_duration
+                shift_end = start + int(duration * 60)
+                interval = (shift_end - start) // (breaks + 1)
+                offset = interval if index == 0 else (index * (interval // count)) % interval
 
-            # Calculate total work minutes and break intervals
-            total_work_minutes = (shift_end_hour - shift_start_hour) * 60
-            break_interval = total_work_minutes // (cls._breaks_per_shift + 1)
-
-            # Calculate staggered break offsets for first break
-            break_offset = break_interval  # Start breaks after first work period
-            break_offset_increment = break_interval // max(1, len(members))
-
-            for member in members:
+                # First work period and first break
                 shifts = []
-                current_time = shift_start_hour * 60  # Start at 9:00 AM in minutes
+                first_break = start + offset
+                if offset > 0:
+                    shifts.append(("Work", start, first_break))
+                current = first_break + break_minutes
+                shifts.append(("Break", first_break, current))
 
-                # First work period before first break
-                first_break_time = current_time + break_offset
-                if current_time < first_break_time:
-                    shifts.append(("Work", current_time, first_break_time))
+                # Remaining work periods and breaks
+                remaining = (shift_end - current) // breaks
+                for i in range(1, breaks + 1):
+                    work_end = current + remaining
+                    if remaining > 0:
+                        shifts.append(("Work", current, work_end))
+                    if i < breaks and work_end < shift_end:
+                        current = work_end + break_minutes
+                        shifts.append(("Break", work_end, current))
 
-                # First break
-                break_end = first_break_time + int(cls._break_duration * 60)
-                shifts.append(("Break", first_break_time, break_end))
-                current_time = break_end
+                role_schedule[member] = shifts
+            schedule[role] = role_schedule
 
-                # Update break offset for next staff member
-                break_offset = (break_offset + break_offset_increment) % break_interval
+        return schedule
 
-                # Remaining work periods and breaks
-                remaining_work_time = shift_end_hour * 60 - current_time
-                remaining_break_interval = remaining_work_time // cls._breaks_per_shift
+    @classmethod
+    def format_time(cls, minutes):
+        return cls._TIME_LABELS[minutes % len(cls._TIME_LABELS)]
 
-                for i in range(1, cls._breaks_per_shift + 1):
-                    work_end = current_time + remaining_break_interval
-                    if current_time < work_end:
-                        shifts.append(("Work", current_time, work_end))
 
-                    if i < cls._breaks_per_shift and work_end < shift_end_hour * 60:
-                        break_start = work_end
-                        break_end = break_start + int(cls._break_duration * 60)
-                        shifts.append(("Break", break_start, break_end))
-                        current_time = break_end
+# --------------------- Branches -------------------------
+class Branch:
+    # One salon branch: its own service catalogue and staff, loaded side by side
+    _branches = {}
 
-                role_schedule[member] = shifts
+    def __init__(self, name, services=None, staff=None, service_roles=None):
+        self.name = name
+        self.services = ServiceManager(services, service_roles)
+        self.staff = StaffManager(staff)
 
-            schedule[role] = role_schedule
+    @classmethod
+    def load(cls, name, services=None, staff=None, service_roles=None):
+        cls._branches[name] = cls(name, services, staff, service_roles)
+        return cls._branches[name]
 
-        return schedule
+    @classmethod
+    def get(cls, name=DEFAULT_BRANCH):
+        if name not in cls._branches:
+            cls.load(name)
+        return cls._branches[name]
 
     @classmethod
-    def format_time(cls, minutes):
-        hours = minutes // 60
-        mins = minutes % 60
-        ampm = "AM" if hours < 12 else "PM"
-        hours = hours if hours <= 12 else hours - 12
-        return f"{hours:02d}:{mins:02d} {ampm}"
+    def get_branch_names(cls):
+        return list(cls._branches.keys())
+
+
+def _branch_schedule(branch, day):
+    return branch.name, branch.staff.generate_schedule(day)
+
+
+def schedule_branches(branches, day=None, executor=None):
+    # Branches share no mutable state, so each one's schedule can be built on
+    # any thread or process pool; defaults to a ProcessPoolExecutor.
+    day = day or date.today()
+    if executor is None:
+        with ProcessPoolExecutor() as pool:
+            return dict(pool.map(_branch_schedule, branches, [day] * len(branches)))
+    return dict(executor.map(_branch_schedule, branches, [day] * len(branches)))
 
 
 # --------------------- Customer and Scheduling Logic -------------------------
 class Customer:
-    def __init__(self, name, services, arrival_time=0):
+    def __init__(self, name, services, arrival_time=0, service_manager=None):
+        service_manager = service_manager or Branch.get().services
         self.name = name
         self.services = services  # List of service names
         self.arrival_time = arrival_time
-        self.service_data = [ServiceManager.get_service(service) or
+        catalogue = service_manager.snapshot()
+        self.service_data = [catalogue.get_service(service) or
                              {"duration": 5, "cost": 0, "priority": 3}
                              for service in services]
+        self.service_roles = [catalogue.get_service_role(service) for service in services]
         self.total_duration = sum(service["duration"] for service in self.service_data)
         self.total_cost = sum(service["cost"] for service in self.service_data)
         self.priority = min(service["priority"] for service in self.service_data)  # Highest priority service
         self.waiting_time = 0
+        self.quoted_wait = 0  # estimated wait quoted at booking, from the role backlog
         self.start_time = 0
         self.end_time = 0
 
+    def role_durations(self):
+        durations = defaultdict(int)
+        for role, data in zip(self.service_roles, self.service_data):
+            durations[role] += data["duration"]
+        return durations
+
+
+class WaitEstimator:
+    # Keeps the outstanding service minutes per role, drained over time by the
+    # role's staff, so a wait quote or a new booking costs O(1) per service.
+    def __init__(self, staff_manager=None):
+        self._staff_manager = staff_manager or Branch.get().staff
+        self._backlog = defaultdict(int)  # role -> queued minutes of work
+        self._as_of = defaultdict(int)  # role -> time the backlog was last drained
+
+    def _drain(self, role, now):
+        staff = max(1, self._staff_manager.count_staff(role))
+        elapsed = now - self._as_of[role]
+        if elapsed > 0:
+            self._backlog[role] = max(0, self._backlog[role] - elapsed * staff)
+            self._as_of[role] = now
+        return staff
+
+    def estimate(self, customer, now=None):
+        now = customer.arrival_time if now is None else now
+        wait = 0
+        for role in customer.role_durations():
+            staff = self._drain(role, now)
+            wait = max(wait, -(-self._backlog[role] // staff))  # round up
+        return wait
+
+    def add(self, customer, now=None):
+        now = customer.arrival_time if now is None else now
+        for role, duration in customer.role_durations().items():
+            self._drain(role, now)
+            self._backlog[role] += duration
+
+    def remove(self, customer, now=None):
+        now = customer.arrival_time if now is None else now
+        for role, duration in customer.role_durations().items():
+            self._drain(role, now)
+            self._backlog[role] = max(0, self._backlog[role] - duration)
+
 
 def fcfs(customers):
     customers_sorted = sorted(customers, key=lambda x: x.arrival_time)
@@ -185,16 +624,6 @@ def fcfs(customers):
         customer.start_time = time
         customer.end_time = time + customer.total_duration
         customer.waiting_time = customer.start_time - customer.arrival_time
-
-        # Calculate dynamic waiting time based on queue length
-        queue_length = len([c for c in customers_sorted if c.arrival_time < customer.arrival_time])
-        if queue_length > 3:  # If more than 3 customers ahead
-            customer.waiting_time += 120  # Add 2 hours
-        elif queue_length > 1:  # If 2-3 customers ahead
-            customer.waiting_time += 30  # Add 30 minutes
-        else:
-            customer.waiting_time += 15  # Minimum 15 minutes wait
-
         results.append(customer)
         time = customer.end_time
 
@@ -217,6 +646,1504 @@ def priority_scheduling(customers):
 
     return results
 
+# Aging lowers a waiting customer's effective burst by `aging` minutes per minute
+# waited. Every waiting customer ages at the same rate, so ordering by
+# burst + aging * arrival_time is the same as ordering by the aged burst at any
+# moment, and the ready queue can stay a plain heap.
+def sjf(customers, aging=0.1):
+    pending = sorted(customers, key=lambda x: x.arrival_time)
+    ready = []
+    time = 0
+    index = 0
+    results = []
+
+    while index < len(pending) or ready:
+        if not ready and time < pending[index].arrival_time:
+            time = pending[index].arrival_time
+        while index < len(pending) and pending[index].arrival_time <= time:
+            customer = pending[index]
+            heapq.heappush(ready, (customer.total_duration + aging * customer.arrival_time, index, customer))
+            index += 1
+
+        _, _, customer = heapq.heappop(ready)
+        customer.start_time = time
+        customer.end_time = time + customer.total_duration
+        customer.waiting_time = customer.start_time - customer.arrival_time
+        results.append(customer)
+        time = customer.end_time
+
+    return results
+
+def srtf(customers, aging=0.1):
+    # Preemptive: the running customer can only be overtaken when someone arrives
+    pending = sorted(customers, key=lambda x: x.arrival_time)
+    remaining = [customer.total_duration for customer in pending]
+    started = [False] * len(pending)
+    ready = []
+    time = 0
+    index = 0
+    results = []
+
+    while index < len(pending) or ready:
+        if not ready and time < pending[index].arrival_time:
+            time = pending[index].arrival_time
+        while index < len(pending) and pending[index].arrival_time <= time:
+            customer = pending[index]
+            heapq.heappush(ready, (remaining[index] + aging * customer.arrival_time, index, customer))
+            index += 1
+
+        _, current, customer = heapq.heappop(ready)
+        if not started[current]:
+            started[current] = True
+            customer.start_time = time
+
+        # Run until this customer finishes or the next one arrives
+        next_arrival = pending[index].arrival_time if index < len(pending) else time + remaining[current]
+        run = min(remaining[current], next_arrival - time)
+        time += run
+        remaining[current] -= run
+
+        if remaining[current] == 0:
+            customer.end_time = time
+            customer.waiting_time = customer.end_time - customer.arrival_time - customer.total_duration
+            results.append(customer)
+        else:
+            heapq.heappush(ready, (remaining[current] + aging * customer.arrival_time, current, customer))
+
+    return results
+
+# --------------------- Appointment Packing -------------------------
+class AppointmentPacker:
+    # Offline packer for a pre-booked day: assigns every service of every
+    # customer to a staff member of the service's role, inside their work
+    # periods (after the last one counts as overtime), one service at a time
+    # per customer, aiming for the earliest possible finish (makespan).
+    # Services go into the earliest gap in a staff member's day that fits,
+    # so gaps left by customers waiting between services get filled.
+    def __init__(self, branch=None, day=None):
+        branch = branch or Branch.get()
+        self.staff = {}  # role -> [(member, [(work_start, work_end), ...])]
+        for role, role_roster in branch.staff.roster_for_day(day or date.today()).items():
+            for member, slots in branch.staff.iter_role_roster(role_roster):
+                periods = [(slots[pos], slots[pos + 1]) for pos in range(0, len(slots), 4)
+                           if slots[pos] != StaffManager._NO_SLOT]
+                if periods:
+                    self.staff.setdefault(role, []).append((member, periods))
+        starts = [periods[0][0] for members in self.staff.values() for _, periods in members]
+        self.opening = min(starts) if starts else branch.staff.shift_start
+
+    @staticmethod
+    def _earliest_gap(free, earliest, duration):
+        # free = (starts, ends) of this member's free intervals, sorted; the
+        # last one is open-ended overtime, so a gap is always found
+        starts, ends = free
+        for i in range(bisect_right(ends, earliest), len(starts)):
+            start = max(starts[i], earliest)
+            if start + duration <= ends[i]:
+                return start, i
+
+    def _place(self, order):
+        # Gaps shorter than the shortest service can never be used, so they are dropped
+        shortest = min((data["duration"] for customer in order for data in customer.service_data), default=1)
+        free = {role: [([work_start for work_start, _ in periods] + [periods[-1][1]],
+                        [work_end for _, work_end in periods] + [float("inf")])  # overtime
+                       for _, periods in members]
+                for role, members in self.staff.items()}
+        busy = {role: [0] * len(members) for role, members in self.staff.items()}
+        last_end = {role: [0] * len(members) for role, members in self.staff.items()}
+        placements, unassigned = [], []
+        finish, last_customer = self.opening, None
+
+        for customer in order:
+            ready = self.opening + customer.arrival_time
+            for service, data, role in zip(customer.services, customer.service_data, customer.service_roles):
+                members = self.staff.get(role)
+                if not members:
+                    unassigned.append((customer, service))
+                    continue
+                duration = data["duration"]
+                (start, position), index = min((self._earliest_gap(free[role][i], ready, duration), i)
+                                               for i in range(len(members)))
+                end = start + duration
+                starts, ends = free[role][index]
+                gap_start, gap_end = starts[position], ends[position]
+                del starts[position], ends[position]
+                if gap_end - end >= shortest:
+                    starts.insert(position, end)
+                    ends.insert(position, gap_end)
+                if start - gap_start >= shortest:
+                    starts.insert(position, gap_start)
+                    ends.insert(position, start)
+                busy[role][index] += duration
+                last_end[role][index] = max(last_end[role][index], end)
+                ready = end
+                placements.append((customer, service, role, members[index][0], start, end))
+                if end > finish:
+                    finish, last_customer = end, customer
+
+        # Idle time: on-duty minutes up to the makespan (plus any overtime) not spent serving
+        idle = 0
+        for role, members in self.staff.items():
+            for i, (_, periods) in enumerate(members):
+                if not busy[role][i]:
+                    continue
+                on_duty = sum(min(work_end, finish) - work_start for work_start, work_end in periods
+                              if work_start < finish)
+                on_duty += max(0, last_end[role][i] - periods[-1][1])
+                idle += on_duty - busy[role][i]
+
+        return {"makespan": finish - self.opening, "idle": idle, "placements": placements,
+                "unassigned": unassigned, "last_customer": last_customer}
+
+    def pack(self, customers, local_search=True, time_limit=1.0, seed=0, patience=200):
+        # Start from the better of LPT (longest customers first) and plain
+        # arrival order, then optionally move whoever finishes last to a random
+        # earlier slot while that improves the result. The search stops after
+        # `patience` moves in a row without improvement, or at time_limit.
+        by_arrival = sorted(customers, key=lambda x: x.arrival_time)
+        arrival_order = self._place(by_arrival)
+        order = sorted(customers, key=lambda x: x.total_duration, reverse=True)
+        best = self._place(order)
+        if (arrival_order["makespan"], arrival_order["idle"]) <= (best["makespan"], best["idle"]):
+            order, best = by_arrival, dict(arrival_order)
+
+        if local_search and len(order) > 1:
+            rng = random.Random(seed)
+            position = {id(customer): i for i, customer in enumerate(order)}
+            deadline = perf_counter() + time_limit
+            stale = 0
+            while stale < patience and perf_counter() < deadline:
+                critical = position[id(best["last_customer"])] if best["last_customer"] else 0
+                if critical == 0:
+                    break
+                candidate = order[:]
+                candidate.insert(rng.randrange(critical), candidate.pop(critical))
+                result = self._place(candidate)
+                if (result["makespan"], result["idle"]) < (best["makespan"], best["idle"]):
+                    order, best, stale = candidate, result, 0
+                    position = {id(customer): i for i, customer in enumerate(order)}
+                else:
+                    stale += 1
+
+        # Compared against the same staff in plain arrival order, and the single-queue fcfs() schedule
+        fcfs_schedule = fcfs(list(customers))
+        best["arrival_order_makespan"] = arrival_order["makespan"]
+        best["arrival_order_idle"] = arrival_order["idle"]
+        best["fcfs_makespan"] = max((customer.end_time for customer in fcfs_schedule), default=0)
+
+        # Customers take the packed times, relative to opening like the other schedulers
+        for customer in customers:
+            customer.start_time = customer.end_time = None
+        for customer, _, _, _, start, end in best["placements"]:
+            if customer.start_time is None or start - self.opening < customer.start_time:
+                customer.start_time = start - self.opening
+            if customer.end_time is None or end - self.opening > customer.end_time:
+                customer.end_time = end - self.opening
+        for customer in customers:
+            customer.start_time = customer.start_time or 0
+            customer.end_time = customer.end_time or 0
+            customer.waiting_time = max(0, customer.start_time - customer.arrival_time)
+        return best
+
+
+# --------------------- Staffing Simulation -------------------------
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class SalonSimulation:
+    # Event kinds. At equal times staff come on duty first, completions free
+    # staff before new arrivals are dispatched, and staff go off duty last.
+    ON_DUTY, COMPLETE, ARRIVAL, OFF_DUTY = range(4)
+
+    def __init__(self, branch=None, days=30, arrivals_per_hour=12, extra_staff=None, extra_staff_days=None,
+                 bookings=(), start_date=None, max_services=2):
+        # Everything is copied into plain data so replications can run in worker processes
+        branch = branch or Branch.get()
+        catalogue, staff_manager = branch.services.snapshot(), branch.staff
+        self.days = days
+        self.arrivals_per_hour = arrivals_per_hour
+        self.max_services = max_services
+        roster_snapshot = staff_manager.snapshot()
+        self.services = {name: (data["duration"], catalogue.get_service_role(name))
+                         for name, data in catalogue.services.items()}
+        self.open_time = roster_snapshot.shift_start
+        self.close_time = roster_snapshot.shift_start + int(roster_snapshot.shift_duration * 60)
+
+        # Pre-booked customers are replayed every day, arrival counted from opening
+        self.bookings = [(customer.arrival_time,
+                          [(data["duration"], role) for data, role in zip(customer.service_data, customer.service_roles)])
+                         for customer in bookings]
+
+        # Hypothetical extra staff work every day, or only on extra_staff_days (Mon=0)
+        staff = {role: list(members) for role, members in roster_snapshot.staff.items()}
+        extra_members = set()
+        for role, count in (extra_staff or {}).items():
+            names = [f"{role} (extra {i + 1})" for i in range(count)]
+            staff.setdefault(role, []).extend(names)
+            extra_members.update(names)
+        self.staff = {role: members for role, members in staff.items() if members}
+
+        # On/off duty events for every work period in the roster
+        self.duty_events = []
+        start_date = start_date or date.today()
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            day_start = offset * 24 * 60
+            extras_working = extra_staff_days is None or day.weekday() in extra_staff_days
+            for role, role_roster in staff_manager.roster_for_day(day, self.staff).items():
+                for member, slots in staff_manager.iter_role_roster(role_roster):
+                    if member in extra_members and not extras_working:
+                        continue
+                    member_index = self.staff[role].index(member)
+                    for pos in range(0, len(slots), 4):
+                        if slots[pos] != StaffManager._NO_SLOT:
+                            self.duty_events.append((day_start + slots[pos], self.ON_DUTY, role, member_index))
+                            self.duty_events.append((day_start + slots[pos + 1], self.OFF_DUTY, role, member_index))
+
+    def _arrivals(self, rng):
+        names = sorted(self.services)
+        rate = self.arrivals_per_hour / 60
+        for offset in range(self.days):
+            day_start = offset * 24 * 60
+            for arrival, steps in self.bookings:
+                yield day_start + self.open_time + arrival, steps
+            if not names or rate <= 0:
+                continue
+            time = self.open_time + rng.expovariate(rate)
+            while time < self.close_time:
+                picked = rng.sample(names, rng.randint(1, min(self.max_services, len(names))))
+                yield day_start + int(time), [self.services[name] for name in picked]
+                time += rng.expovariate(rate)
+
+    def run(self, seed):
+        rng = random.Random(seed)
+        events = [(time, kind, seq, (role, index))
+                  for seq, (time, kind, role, index) in enumerate(self.duty_events)]
+        seq = len(events)
+        for time, steps in self._arrivals(rng):
+            events.append((time, self.ARRIVAL, seq, steps))
+            seq += 1
+        heapq.heapify(events)
+
+        queues = {role: deque() for role in self.staff}  # (enqueued_at, visit)
+        on_duty = {role: [False] * len(members) for role, members in self.staff.items()}
+        busy = {role: [False] * len(members) for role, members in self.staff.items()}
+        busy_minutes = {role: 0 for role in self.staff}
+        duty_minutes = {role: 0 for role in self.staff}
+        waits = []
+        unroutable = 0
+
+        def enqueue(now, visit):
+            # visit = [remaining steps, step index, accumulated wait]
+            role = visit[0][visit[1]][1]
+            if role not in queues:
+                return False
+            queues[role].append((now, visit))
+            dispatch(now, role)
+            return True
+
+        def dispatch(now, role):
+            nonlocal seq
+            queue = queues[role]
+            for index in range(len(busy[role])):
+                if not queue:
+                    return
+                if on_duty[role][index] and not busy[role][index]:
+                    enqueued_at, visit = queue.popleft()
+                    visit[2] += now - enqueued_at
+                    duration = visit[0][visit[1]][0]
+                    busy[role][index] = True
+                    busy_minutes[role] += duration
+                    heapq.heappush(events, (now + duration, self.COMPLETE, seq, (role, index, visit)))
+                    seq += 1
+
+        while events:
+            now, kind, _, payload = heapq.heappop(events)
+            if kind == self.ARRIVAL:
+                if not enqueue(now, [payload, 0, 0]):
+                    unroutable += 1
+            elif kind == self.COMPLETE:
+                role, index, visit = payload
+                busy[role][index] = False
+                visit[1] += 1
+                if visit[1] < len(visit[0]):
+                    if not enqueue(now, visit):
+                        unroutable += 1
+                else:
+                    waits.append(visit[2])
+                dispatch(now, role)
+            elif kind == self.ON_DUTY:
+                role, index = payload
+                on_duty[role][index] = True
+                duty_minutes[role] -= now
+                dispatch(now, role)
+            else:
+                # Going on break or ending the shift; a service in progress is finished first
+                role, index = payload
+                on_duty[role][index] = False
+                duty_minutes[role] += now
+
+        waits.sort()
+        return {
+            "seed": seed,
+            "served": len(waits),
+            "unserved": sum(len(queue) for queue in queues.values()) + unroutable,
+            "mean_wait": statistics.fmean(waits) if waits else 0,
+            "p50_wait": _percentile(waits, 0.5),
+            "p90_wait": _percentile(waits, 0.9),
+            "max_wait": waits[-1] if waits else 0,
+            "utilization": {role: busy_minutes[role] / duty_minutes[role] if duty_minutes[role] else 0
+                            for role in self.staff},
+        }
+
+    def run_replications(self, replications=20, seed=0, workers=None):
+        seeds = [seed + i for i in range(replications)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self.run, seeds))
+
+        def distribution(values):
+            values = sorted(values)
+            return {"mean": statistics.fmean(values), "p5": _percentile(values, 0.05),
+                    "p50": _percentile(values, 0.5), "p95": _percentile(values, 0.95)}
+
+        return {
+            "replications": results,
+            "mean_wait": distribution([r["mean_wait"] for r in results]),
+            "p90_wait": distribution([r["p90_wait"] for r in results]),
+            "unserved": distribution([r["unserved"] for r in results]),
+            "utilization": {role: distribution([r["utilization"][role] for r in results])
+                            for role in self.staff},
+        }
+
+
+# --------------------- Booking Service -------------------------
+class BookingService:
+    # Local booking endpoint shared by front-desk terminals and the GUI.
+    # Protocol is one JSON object per line over TCP or a Unix socket:
+    #   {"op": "book", "name": ..., "services": [...], "ref": ...} -> {"op": "booked", ...}
+    #   {"op": "subscribe"} -> {"op": "schedule", "entries": [...]} after every batch
+    # Submissions are coalesced for batch_window seconds and scheduled together.
+    def __init__(self, branch=None, batch_window=0.005, journal=None, customers=()):
+        self.branch = branch or Branch.get()
+        self.batch_window = batch_window
+        self.journal = journal
+        self.customers = list(customers)
+        # Held while the list, the estimator and the journal change together,
+        # so a cancel from the GUI thread can't land between them
+        self.lock = threading.Lock()
+        self.listeners = []  # called with each new Customer, on the service thread
+        self.estimator = WaitEstimator(self.branch.staff)
+        self._queue_end = 0  # end time of the FCFS queue so far
+        self._clock_offset = 0  # restored bookings keep their arrivals; new ones come after
+        for customer in fcfs(self.customers):
+            self.estimator.add(customer)
+            self._queue_end = customer.end_time
+            self._clock_offset = max(self._clock_offset, customer.arrival_time)
+        self._pending = []
+        self._subscribers = set()
+        self._loop = None
+        self._wakeup = None
+        self._started_at = 0
+
+    def now(self):
+        # Arrival times are whole minutes since the service started
+        return self._clock_offset + int((self._loop.time() - self._started_at) // 60)
+
+    async def submit(self, name, services):
+        if name is not None and not isinstance(name, str):
+            raise ValueError("Customer name must be a string!")
+        if services is not None and (not isinstance(services, list) or
+                                     not all(isinstance(service, str) for service in services)):
+            raise ValueError("Services must be a list of service names!")
+        name = (name or "").strip()
+        catalogue = self.branch.services.snapshot()
+        if not name:
+            raise ValueError("Please enter customer name!")
+        if not services:
+            raise ValueError("Please add at least one service!")
+        unknown = [service for service in services if catalogue.get_service(service) is None]
+        if unknown:
+            raise ValueError(f"Unknown service: {', '.join(unknown)}")
+
+        future = self._loop.create_future()
+        self._pending.append((name, list(services), self.now(), future))
+        self._wakeup.set()
+        return await future
+
+    def cancel(self, customer):
+        # Called from the GUI thread. The journal records cancels by list
+        # position, so the position is looked up, journaled and deleted under
+        # the lock the batcher holds while it appends and compacts.
+        with self.lock:
+            index = next((i for i, booked in enumerate(self.customers) if booked is customer), None)
+            if index is None:
+                return False
+            if self.journal:
+                self.journal.record_cancel(index)
+                self.journal.commit()
+            del self.customers[index]
+            self.estimator.remove(customer, self.now())
+        return True
+
+    def submit_threadsafe(self, name, services):
+        # For callers outside the service loop, e.g. the GUI thread
+        return asyncio.run_coroutine_threadsafe(self.submit(name, services), self._loop)
+
+    def _schedule_batch(self, batch):
+        # Arrivals are taken from a monotonic clock, so appending to the FCFS
+        # queue gives the same result as rerunning fcfs() over every customer.
+        # The batch is staged first and only published once the journal
+        # holds all of it; if that commit fails, nothing here has changed.
+        staged = []
+        queue_end = self._queue_end
+        for name, services, arrival, future in batch:
+            customer = Customer(name, services, arrival, service_manager=self.branch.services)
+            if self.journal:
+                try:
+                    self.journal.check_booking(customer)
+                except ValueError as error:  # not representable in the journal; nothing booked
+                    future.set_exception(error)
+                    continue
+            customer.start_time = max(queue_end, arrival)
+            customer.end_time = customer.start_time + customer.total_duration
+            customer.waiting_time = customer.start_time - arrival
+            queue_end = customer.end_time
+            staged.append((customer, future))
+
+        booked = []
+        with self.lock:
+            # One journal commit for the whole batch, before anyone is told it is booked
+            if self.journal and staged:
+                self.journal.record_bookings([customer for customer, _ in staged])
+
+            for customer, future in staged:
+                customer.quoted_wait = self.estimator.estimate(customer)
+                self.estimator.add(customer)
+                self.customers.append(customer)
+                entry = {"id": len(self.customers) - 1, "name": customer.name, "services": customer.services,
+                         "start": customer.start_time, "end": customer.end_time,
+                         "wait": customer.waiting_time, "quote": customer.quoted_wait,
+                         "cost": customer.total_cost}
+                booked.append((customer, entry, future))
+            self._queue_end = queue_end
+
+            if self.journal:
+                try:
+                    self.journal.maybe_compact(self.branch, self.customers)
+                except Exception as error:  # the log still holds everything; compact again later
+                    self._loop.call_exception_handler({"message": "Journal compaction failed",
+                                                       "exception": error})
+        for customer, entry, future in booked:
+            if not future.done():
+                future.set_result((customer, entry))
+        for customer, _, _ in booked:
+            for listener in self.listeners:
+                try:
+                    listener(customer)
+                except Exception as error:  # a broken listener must not undo the booking
+                    self._loop.call_exception_handler({"message": "Booking listener failed", "exception": error})
+        return [entry for _, entry, _ in booked]
+
+    async def _batcher(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.batch_window)
+            self._wakeup.clear()
+            batch, self._pending = self._pending, []
+            try:
+                entries = self._schedule_batch(batch)
+            except Exception as error:
+                # Fail this batch's callers and keep serving the next one
+                for _, _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self._push({"op": "schedule", "entries": entries})
+
+    def _push(self, message):
+        line = (json.dumps(message) + "\n").encode()
+        for writer in list(self._subscribers):
+            if writer.is_closing():
+                self._subscribers.discard(writer)
+            else:
+                writer.write(line)
+
+    async def _reply(self, writer, request):
+        try:
+            _, entry = await self.submit(request.get("name"), request.get("services"))
+            reply = dict(entry, op="booked")
+        except Exception as error:
+            reply = {"op": "error", "error": str(error) or type(error).__name__}
+        if "ref" in request:
+            reply["ref"] = request["ref"]
+        if not writer.is_closing():
+            writer.write((json.dumps(reply) + "\n").encode())
+
+    async def _handle_client(self, reader, writer):
+        replies = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    writer.write(b'{"op": "error", "error": "Invalid JSON"}\n')
+                    continue
+                if not isinstance(request, dict):
+                    writer.write(b'{"op": "error", "error": "Expected a JSON object"}\n')
+                    continue
+
+                if request.get("op") == "book":
+                    # Requests are pipelined; replies carry the client's "ref"
+                    task = asyncio.ensure_future(self._reply(writer, request))
+                    replies.add(task)
+                    task.add_done_callback(replies.discard)
+                elif request.get("op") == "subscribe":
+                    self._subscribers.add(writer)
+                else:
+                    writer.write(b'{"op": "error", "error": "Unknown op"}\n')
+                await writer.drain()
+            if replies:
+                await asyncio.gather(*replies)
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        self._loop = asyncio.get_running_loop()
+        self._started_at = self._loop.time()
+        self._wakeup = asyncio.Event()
+        self._loop.create_task(self._batcher())
+        if path:
+            return await asyncio.start_unix_server(self._handle_client, path)
+        return await asyncio.start_server(self._handle_client, host, port)
+
+    def start_in_thread(self, host="127.0.0.1", port=8765, path=None):
+        # Runs the service on its own event loop next to the Qt event loop
+        started = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start(host, port, path))
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait()
+
+
+# --------------------- Booking Journal -------------------------
+class BookingJournal:
+    # Append-only log of bookings and service/staff edits in fixed-width
+    # 64-byte records: kind, count, aux, value, cost, seq, 8 ids, 32-byte name.
+    # Services and roles are stored by id; SERVICE_ID / ROLE records bind ids to names.
+    # A name longer than 32 bytes is written first as NAME records, each carrying
+    # 32 bytes of it and its full length in value; the record that follows owns it.
+    RECORD = struct.Struct("<BBHiII8H32s")
+    MAX_IDS = 8
+    NAME_SIZE = 32
+    (SNAPSHOT, BOOKING, BOOKING_MORE, SERVICE_ID, SERVICE, SERVICE_ROLE, SERVICE_DELETE,
+     ROLE, STAFF_ADD, STAFF_REMOVE, CANCEL, NAME) = range(1, 13)
+
+    def __init__(self, path, group_size=64, compact_threshold=100000):
+        self.path = path
+        self.snapshot_path = path + ".snap"
+        self.group_size = group_size
+        self.compact_threshold = compact_threshold
+        self._lock = threading.Lock()  # the GUI and the booking service may both append
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._logged = 0
+        self._seq = 0
+        self._service_ids = {}
+        self._role_ids = {}
+
+        # Drop a torn record left by a crash mid-write
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            if size % self.RECORD.size:
+                os.truncate(path, size - size % self.RECORD.size)
+        self.state = self._replay()
+        self._file = open(path, "ab", buffering=0)  # written with os.write in _commit_locked
+
+    def _records(self, path):
+        if not os.path.exists(path) or os.path.getsize(path) < self.RECORD.size:
+            return
+        with open(path, "rb") as journal_file, \
+                mmap.mmap(journal_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            whole = len(mapped) - len(mapped) % self.RECORD.size
+            with memoryview(mapped) as view, view[:whole] as records:
+                yield from self.RECORD.iter_unpack(records)
+
+    def _replay(self):
+        services, roles, staff, bookings = {}, {}, {}, []
+        service_names, role_names = {}, {}
+        snapshot_seq = 0
+
+        for in_log, path in ((False, self.snapshot_path), (True, self.path)):
+            long_name, long_size, long_start = bytearray(), 0, 0
+            for position, (kind, count, aux, value, cost, seq, *ids, name) in enumerate(self._records(path)):
+                if in_log:
+                    if seq <= snapshot_seq:
+                        continue  # already folded into the snapshot
+                    self._logged += 1
+                self._seq = max(self._seq, seq)
+
+                if kind == self.NAME:
+                    if not long_name:
+                        long_start = position
+                    long_name += name
+                    long_size = value
+                    continue
+                if long_name:
+                    name = bytes(long_name[:long_size])
+                    long_name.clear()
+                name = name.rstrip(b"\0").decode("utf-8", "ignore")
+
+                if kind == self.SNAPSHOT:
+                    snapshot_seq = seq
+                elif kind == self.BOOKING:
+                    bookings.append([name, [service_names[i] for i in ids[:count]], value, cost])
+                elif kind == self.BOOKING_MORE:
+                    bookings[-1][1].extend(service_names[i] for i in ids[:count])
+                elif kind == self.CANCEL:
+                    if 0 <= value < len(bookings):
+                        del bookings[value]
+                elif kind == self.SERVICE_ID:
+                    service_names[ids[0]] = name
+                elif kind == self.SERVICE:
+                    service_names[ids[0]] = name
+                    services[name] = {"cost": cost, "duration": value, "priority": aux}
+                elif kind == self.SERVICE_ROLE:
+                    roles[service_names[ids[0]]] = name
+                elif kind == self.SERVICE_DELETE:
+                    services.pop(service_names[ids[0]], None)
+                    roles.pop(service_names[ids[0]], None)
+                elif kind == self.ROLE:
+                    role_names[ids[0]] = name
+                    staff.setdefault(name, [])
+                elif kind == self.STAFF_ADD:
+                    if name not in staff[role_names[ids[0]]]:
+                        staff[role_names[ids[0]]].append(name)
+                elif kind == self.STAFF_REMOVE:
+                    if name in staff[role_names[ids[0]]]:
+                        staff[role_names[ids[0]]].remove(name)
+
+            if long_name and in_log:
+                # A crash left the start of a long name without its record; later
+                # appends must not pick it up
+                os.truncate(path, long_start * self.RECORD.size)
+
+        self._service_ids = {name: service_id for service_id, name in service_names.items()}
+        self._role_ids = {name: role_id for role_id, name in role_names.items()}
+        return {"services": services, "roles": roles, "staff": staff, "bookings": bookings}
+
+    def restore(self, branch_name=DEFAULT_BRANCH):
+        # Rebuilds the branch and its customers, or None for an empty journal
+        if not self.state["services"] and not self.state["staff"]:
+            return None
+        branch = Branch.load(branch_name, self.state["services"], self.state["staff"], self.state["roles"])
+        customers = []
+        for name, services, arrival, cost in self.state["bookings"]:
+            customer = Customer(name, services, arrival, service_manager=branch.services)
+            customer.total_cost = cost  # what was billed, even if prices changed since
+            customers.append(customer)
+        return branch, customers
+
+    # _pack, _id and the *_records builders allocate seqs and ids, so they
+    # only run with self._lock held.
+    @staticmethod
+    def _check_values(name, aux=0, value=0, cost=0):
+        if not 0 <= cost <= 0xFFFFFFFF:
+            raise ValueError(f"Cost {cost} for {name!r} can't be journaled (0 to {0xFFFFFFFF})")
+        if not 0 <= aux <= 0xFFFF:
+            raise ValueError(f"Priority {aux} for {name!r} can't be journaled (0 to {0xFFFF})")
+        if not -2 ** 31 <= value < 2 ** 31:
+            raise ValueError(f"Value {value} for {name!r} can't be journaled")
+
+    def _pack(self, kind, name="", ids=(), count=0, aux=0, value=0, cost=0):
+        self._check_values(name, aux, value, cost)
+        encoded = name.encode("utf-8")
+        records = []
+        if len(encoded) > self.NAME_SIZE:
+            for start in range(0, len(encoded), self.NAME_SIZE):
+                self._seq += 1
+                records.append(self.RECORD.pack(self.NAME, 0, 0, len(encoded), 0, self._seq,
+                                                *[0] * self.MAX_IDS, encoded[start:start + self.NAME_SIZE]))
+        self._seq += 1
+        ids = list(ids) + [0] * (self.MAX_IDS - len(ids))
+        records.append(self.RECORD.pack(kind, count, aux, value, cost, self._seq, *ids, encoded))
+        return b"".join(records)
+
+    def _id(self, table, kind, name, records):
+        if name not in table:
+            table[name] = len(table) + 1
+            records.append(self._pack(kind, name, [table[name]]))
+        return table[name]
+
+    def _build(self, build):
+        # Runs build(records) under the lock. If it fails, ids it handed out
+        # are taken back, since their binding records are never written.
+        sizes = self._id_sizes()
+        records = []
+        try:
+            build(records)
+        except Exception:
+            self._take_back_ids(sizes)
+            raise
+        return records
+
+    def _id_sizes(self):
+        return len(self._service_ids), len(self._role_ids)
+
+    def _take_back_ids(self, sizes):
+        # Ids are handed out in order, so the newest ones are the last entries
+        for table, size in zip((self._service_ids, self._role_ids), sizes):
+            while len(table) > size:
+                table.popitem()
+
+    def _append(self, build):
+        with self._lock:
+            records = self._build(build)
+            for record in records:
+                self._buffer += record
+                self._buffered += len(record) // self.RECORD.size
+            if self._buffered >= self.group_size:
+                self._commit_locked()
+
+    def _commit_locked(self):
+        # On failure the log is cut back to where it was, so a half-written
+        # group never replays; the buffer is kept for the next commit
+        if self._buffer:
+            descriptor = self._file.fileno()
+            position = os.lseek(descriptor, 0, os.SEEK_END)
+            try:
+                written = 0
+                while written < len(self._buffer):
+                    with memoryview(self._buffer)[written:] as pending:
+                        written += os.write(descriptor, pending)
+                os.fsync(descriptor)
+            except BaseException:
+                os.ftruncate(descriptor, position)
+                raise
+            self._logged += self._buffered
+            self._buffer.clear()
+            self._buffered = 0
+
+    def commit(self):
+        # Group commit: everything appended since the last commit hits disk with one fsync
+        with self._lock:
+            self._commit_locked()
+
+    def _booking_records(self, customer, records):
+        ids = [self._id(self._service_ids, self.SERVICE_ID, service, records) for service in customer.services]
+        kind = self.BOOKING
+        for chunk in range(0, max(1, len(ids)), self.MAX_IDS):
+            chunk_ids = ids[chunk:chunk + self.MAX_IDS]
+            records.append(self._pack(kind, customer.name, chunk_ids, len(chunk_ids),
+                                      value=customer.arrival_time, cost=customer.total_cost))
+            kind = self.BOOKING_MORE
+
+    def _service_records(self, name, details, role, records):
+        service_id = self._id(self._service_ids, self.SERVICE_ID, name, records)
+        records.append(self._pack(self.SERVICE, name, [service_id], aux=details["priority"],
+                                  value=details["duration"], cost=details["cost"]))
+        if role:
+            records.append(self._pack(self.SERVICE_ROLE, role, [service_id]))
+
+    # The record_* methods raise ValueError, and write nothing, for values
+    # the record format can't hold (e.g. a negative cost or priority)
+    def record_booking(self, customer):
+        self._append(lambda records: self._booking_records(customer, records))
+
+    def check_booking(self, customer):
+        # Raises ValueError if record_booking(s) would reject this customer
+        self._check_values(customer.name, value=customer.arrival_time, cost=customer.total_cost)
+
+    def record_bookings(self, customers):
+        # Appends and commits the bookings as one unit. If the commit fails,
+        # none of them stay in the log, the buffer or the id tables.
+        with self._lock:
+            self._commit_locked()  # earlier appends succeed or fail on their own
+            sizes = self._id_sizes()
+            records = self._build(lambda records: [self._booking_records(customer, records)
+                                                   for customer in customers])
+            for record in records:
+                self._buffer += record
+                self._buffered += len(record) // self.RECORD.size
+            try:
+                self._commit_locked()
+            except BaseException:
+                self._buffer.clear()
+                self._buffered = 0
+                self._take_back_ids(sizes)
+                raise
+
+    def record_cancel(self, index):
+        # index is the booking's position in the customer list when it was cancelled
+        self._append(lambda records: records.append(self._pack(self.CANCEL, value=index)))
+
+    def record_service(self, name, details, role=None):
+        self._append(lambda records: self._service_records(name, details, role, records))
+
+    def record_service_delete(self, name):
+        def build(records):
+            service_id = self._id(self._service_ids, self.SERVICE_ID, name, records)
+            records.append(self._pack(self.SERVICE_DELETE, name, [service_id]))
+        self._append(build)
+
+    def record_staff(self, role, name, added=True):
+        def build(records):
+            role_id = self._id(self._role_ids, self.ROLE, role, records)
+            records.append(self._pack(self.STAFF_ADD if added else self.STAFF_REMOVE, name, [role_id]))
+        self._append(build)
+
+    def compact(self, branch, customers):
+        # Writes the full current state as a snapshot, then empties the log.
+        # The snapshot ends at the last logged seq, so if we crash before the
+        # truncate, replay skips the log records it already contains.
+        def build(records):
+            records.extend(self._pack(self.SERVICE_ID, name, [service_id])
+                           for name, service_id in list(self._service_ids.items()))
+            records.extend(self._pack(self.ROLE, role, [role_id]) for role, role_id in list(self._role_ids.items()))
+            catalogue = branch.services.snapshot()
+            for name, details in catalogue.services.items():
+                self._service_records(name, details, catalogue.roles.get(name), records)
+            for role, members in branch.staff.snapshot().staff.items():
+                role_id = self._id(self._role_ids, self.ROLE, role, records)
+                records.extend(self._pack(self.STAFF_ADD, member, [role_id]) for member in members)
+            for customer in list(customers):
+                self._booking_records(customer, records)
+            records.append(self._pack(self.SNAPSHOT))
+
+        with self._lock:
+            self._commit_locked()
+            records = self._build(build)
+
+            temp_path = self.snapshot_path + ".tmp"
+            with open(temp_path, "wb") as snapshot_file:
+                snapshot_file.write(b"".join(records))
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._logged = 0
+
+    def maybe_compact(self, branch, customers):
+        if self._logged >= self.compact_threshold:
+            self.compact(branch, customers)
+
+    def close(self):
+        self.commit()
+        self._file.close()
+
+
+# --------------------- Revenue Rollups -------------------------
+class RevenueRollup:
+    # Pre-aggregated revenue and utilization counters. Each booking, edit,
+    # cancellation or staff assignment adjusts them in O(services), so the
+    # dashboard reads totals without rescanning the bookings.
+    UNASSIGNED = "Unassigned"
+
+    def __init__(self, opening=9 * 60):
+        self.opening = opening
+        self._lock = threading.Lock()  # the booking service records from its own thread
+        self.bookings = 0
+        self.revenue = 0
+        self.by_service = defaultdict(lambda: [0, 0])  # service -> [bookings, revenue]
+        self.by_hour = defaultdict(int)  # hour of arrival -> revenue
+        self.by_staff = defaultdict(lambda: [0, 0])  # member -> [services, revenue]
+        self.busy_minutes = defaultdict(int)  # member -> minutes of assigned services
+        self.work_minutes = defaultdict(int)  # member -> rostered work minutes
+        self.break_minutes = defaultdict(int)
+        self._roster_minutes = {}  # (day, member) -> (work, break) already counted
+
+    def _apply(self, customer, sign):
+        staff = getattr(customer, "assigned_staff", None) or [self.UNASSIGNED] * len(customer.services)
+        self.bookings += sign
+        self.revenue += sign * customer.total_cost
+        self.by_hour[((self.opening + customer.arrival_time) // 60) % 24] += sign * customer.total_cost
+        for service, data, member in zip(customer.services, customer.service_data, staff):
+            service_totals = self.by_service[service]
+            service_totals[0] += sign
+            service_totals[1] += sign * data["cost"]
+            staff_totals = self.by_staff[member]
+            staff_totals[0] += sign
+            staff_totals[1] += sign * data["cost"]
+            if member != self.UNASSIGNED:
+                self.busy_minutes[member] += sign * data["duration"]
+
+    def record(self, customer):
+        with self._lock:
+            self._apply(customer, 1)
+
+    def cancel(self, customer):
+        with self._lock:
+            self._apply(customer, -1)
+
+    def edit(self, old_customer, new_customer):
+        with self._lock:
+            self._apply(old_customer, -1)
+            self._apply(new_customer, 1)
+
+    def assign_staff(self, customer, members):
+        # members lines up with customer.services
+        with self._lock:
+            self._apply(customer, -1)
+            customer.assigned_staff = list(members)
+            self._apply(customer, 1)
+
+    def record_roster(self, day, roster):
+        # Work and break minutes from roster_for_day(); regenerating a day replaces its figures
+        with self._lock:
+            for role_roster in roster.values():
+                for member, slots in StaffManager.iter_role_roster(role_roster):
+                    work = sum(slots[pos + 1] - slots[pos] for pos in range(0, len(slots), 4)
+                               if slots[pos] != StaffManager._NO_SLOT)
+                    breaks = sum(slots[pos + 1] - slots[pos] for pos in range(2, len(slots), 4)
+                                 if slots[pos] != StaffManager._NO_SLOT)
+                    old_work, old_breaks = self._roster_minutes.get((day, member), (0, 0))
+                    self.work_minutes[member] += work - old_work
+                    self.break_minutes[member] += breaks - old_breaks
+                    self._roster_minutes[(day, member)] = (work, breaks)
+
+    def totals(self):
+        with self._lock:
+            staff = set(self.by_staff) | set(self.work_minutes)
+            return {
+                "bookings": self.bookings,
+                "revenue": self.revenue,
+                "by_service": {name: tuple(values) for name, values in self.by_service.items() if values[0]},
+                "by_hour": {hour: revenue for hour, revenue in sorted(self.by_hour.items()) if revenue},
+                "by_staff": {member: {"services": self.by_staff[member][0] if member in self.by_staff else 0,
+                                      "revenue": self.by_staff[member][1] if member in self.by_staff else 0,
+                                      "work": self.work_minutes.get(member, 0),
+                                      "breaks": self.break_minutes.get(member, 0),
+                                      "utilization": (self.busy_minutes.get(member, 0) / self.work_minutes[member]
+                                                      if self.work_minutes.get(member) else 0)}
+                             for member in sorted(staff)},
+            }
+
+
+# --------------------- Booking Search -------------------------
+class BookingIndex:
+    # Sorted name keys for prefix lookups, an inverted service -> bookings
+    # index and a sorted arrival index. Adding or removing a booking is a
+    # bisect plus an insert, and a search only touches the matches.
+    def __init__(self, customers=(), opening=9 * 60):
+        self.opening = opening
+        self._lock = threading.Lock()  # the booking service adds from its own thread
+        self._seq = 0
+        self._bookings = {}  # seq -> customer
+        self._seqs = {}  # id(customer) -> seq
+        self._names = []  # sorted (lowercase name, seq)
+        self._arrivals = []  # sorted (arrival_time, seq)
+        self._services = defaultdict(dict)  # lowercase service -> {seq: customer}, in booking order
+        for customer in customers:
+            self._seq += 1
+            self._index(customer, self._seq)
+            self._names.append((customer.name.lower(), self._seq))
+            self._arrivals.append((customer.arrival_time, self._seq))
+        self._names.sort()
+        self._arrivals.sort()
+
+    def __len__(self):
+        return len(self._bookings)
+
+    def add(self, customer):
+        with self._lock:
+            self._seq += 1
+            self._index(customer, self._seq)
+            insort(self._names, (customer.name.lower(), self._seq))
+            insort(self._arrivals, (customer.arrival_time, self._seq))
+
+    def _index(self, customer, seq):
+        self._bookings[seq] = customer
+        self._seqs[id(customer)] = seq
+        for service in customer.services:
+            self._services[service.lower()][seq] = customer
+
+    def remove(self, customer):
+        with self._lock:
+            seq = self._seqs.pop(id(customer), None)
+            if seq is None:
+                return
+            del self._bookings[seq]
+            for entries, key in ((self._names, (customer.name.lower(), seq)),
+                                 (self._arrivals, (customer.arrival_time, seq))):
+                pos = bisect_left(entries, key)
+                if pos < len(entries) and entries[pos] == key:
+                    del entries[pos]
+            for service in customer.services:
+                bookings = self._services.get(service.lower())
+                if bookings is not None:
+                    bookings.pop(seq, None)
+                    if not bookings:
+                        del self._services[service.lower()]
+
+    def by_customer(self, name):
+        # Every booking under exactly this name, oldest first
+        key = name.lower()
+        with self._lock:
+            start = bisect_left(self._names, (key,))
+            end = bisect_right(self._names, (key, float("inf")))
+            return [self._bookings[seq] for _, seq in self._names[start:end]]
+
+    def by_name(self, prefix, limit=None):
+        prefix = prefix.lower()
+        with self._lock:
+            start = bisect_left(self._names, (prefix,))
+            end = bisect_left(self._names, (prefix + "\uffff",))
+            if limit is not None:
+                end = min(end, start + limit)
+            return [self._bookings[seq] for _, seq in self._names[start:end]]
+
+    def by_service(self, service, limit=None):
+        with self._lock:
+            bookings = self._services.get(service.lower(), {})
+            return list(islice(bookings.values(), limit))
+
+    def by_arrival(self, start, end, limit=None):
+        # Bookings arriving in [start, end), in minutes after opening
+        with self._lock:
+            low = bisect_left(self._arrivals, (start,))
+            high = bisect_left(self._arrivals, (end,))
+            if limit is not None:
+                high = min(high, low + limit)
+            return [self._bookings[seq] for _, seq in self._arrivals[low:high]]
+
+    def parse_clock(self, text):
+        hours, _, minutes = text.strip().partition(":")
+        return int(hours) * 60 + int(minutes or 0) - self.opening
+
+    def search(self, text, limit=100):
+        # "10:00-11:30" searches arrivals, anything else matches a customer
+        # name prefix or a service name prefix
+        text = text.strip()
+        if not text:
+            return []
+        if "-" in text and ":" in text:
+            try:
+                start, end = text.split("-", 1)
+                return self.by_arrival(self.parse_clock(start), self.parse_clock(end), limit)
+            except ValueError:
+                pass
+
+        results = self.by_name(text, limit)
+        seen = {id(customer) for customer in results}
+        prefix = text.lower()
+        with self._lock:
+            services = [service for service in self._services if service.startswith(prefix)]
+        for service in services:
+            for customer in self.by_service(service, limit):
+                if len(results) >= limit:
+                    return results
+                if id(customer) not in seen:
+                    seen.add(id(customer))
+                    results.append(customer)
+        return results
+
+
+# --------------------- Customer Profiles -------------------------
+class CustomerProfile:
+    def __init__(self, name, services, visits, last_visit):
+        self.name = name
+        self.services = services  # usual services, most booked combination
+        self.visits = visits
+        self.last_visit = last_visit  # arrival time of the latest booking
+        self.version = None  # catalogue version the totals below were priced at
+        self.service_data = []
+        self.total_cost = 0
+        self.total_duration = 0
+
+    def price(self, catalogue):
+        if self.version != catalogue.version:
+            self.service_data = [catalogue.get_service(service) or
+                                 {"duration": 5, "cost": 0, "priority": 3}
+                                 for service in self.services]
+            self.total_cost = sum(service["cost"] for service in self.service_data)
+            self.total_duration = sum(service["duration"] for service in self.service_data)
+            self.version = catalogue.version
+        return self
+
+
+class ProfileCache:
+    # Bounded LRU of returning-customer profiles. A miss builds the profile
+    # from loader(name), which returns that customer's past bookings; prices
+    # are only recomputed when the catalogue has changed since.
+    def __init__(self, loader, service_manager, capacity=256):
+        self._loader = loader
+        self._service_manager = service_manager
+        self.capacity = capacity
+        self._profiles = OrderedDict()  # lowercase name -> CustomerProfile, least recent first
+        self._lock = threading.Lock()  # the booking service records from its own thread
+
+    def _build(self, name, bookings):
+        if not bookings:
+            return None
+        usual = Counter(tuple(customer.services) for customer in bookings)
+        # Most booked combination, the latest one winning ties
+        services = max(reversed([tuple(customer.services) for customer in bookings]), key=usual.__getitem__)
+        return CustomerProfile(bookings[-1].name, list(services), len(bookings), bookings[-1].arrival_time)
+
+    def _store(self, key, profile):
+        self._profiles[key] = profile
+        self._profiles.move_to_end(key)
+        while len(self._profiles) > self.capacity:
+            self._profiles.popitem(last=False)
+
+    def get(self, name):
+        key = name.strip().lower()
+        if not key:
+            return None
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+        if profile is None:
+            profile = self._build(name.strip(), self._loader(name.strip()))
+            if profile is None:
+                return None
+            with self._lock:
+                self._store(key, profile)
+        return profile.price(self._service_manager.snapshot())
+
+    def refresh(self, customer):
+        # Call after one of customer's bookings is added or cancelled. Only a
+        # cached profile is rebuilt (or dropped when no bookings are left);
+        # the rest load lazily on demand.
+        key = customer.name.lower()
+        with self._lock:
+            if key in self._profiles:
+                profile = self._build(customer.name, self._loader(customer.name))
+                if profile is None:
+                    del self._profiles[key]
+                else:
+                    self._store(key, profile)
+
+    def __len__(self):
+        return len(self._profiles)
+
+
+# --------------------- Billing -------------------------
+def _billing_row(customer):
+    # What the customer was booked and billed at, as plain values that pickle cheaply
+    return (customer.name, customer.arrival_time,
+            [(service, role, data["cost"], data["duration"])
+             for service, role, data in zip(customer.services, customer.service_roles, customer.service_data)],
+            customer.total_cost)
+
+
+def close_branch_day(branch, bookings, out_dir, day=None, fmt="csv"):
+    # Writes the day's invoices and ledger for one branch in a single pass.
+    # bookings are Customers or _billing_row() rows. Line items carry the
+    # prices each customer was booked at and totals what they were billed,
+    # so later catalogue edits don't rewrite the day's takings.
+    day = day or date.today()
+    opening = branch.staff.shift_start
+    stem = os.path.join(out_dir, f"{branch.name}-{day.isoformat()}")
+    invoice_path = stem + ("-invoices.csv" if fmt == "csv" else "-invoices.jsonl")
+    ledger_path = stem + ("-ledger.csv" if fmt == "csv" else "-ledger.json")
+
+    by_service = defaultdict(lambda: [0, 0])  # service -> [count, revenue]
+    invoices = revenue = 0
+    with open(invoice_path, "w", newline="", encoding="utf-8", buffering=1 << 20) as file:
+        writer = csv.writer(file) if fmt == "csv" else None
+        if writer:
+            writer.writerow(["invoice", "customer", "arrival", "service", "role", "duration", "cost"])
+        for booking in bookings:
+            name, arrival, lines, total = _billing_row(booking) if isinstance(booking, Customer) else booking
+            invoices += 1
+            number = f"{day:%Y%m%d}-{invoices:05d}"
+            arrival = StaffManager.format_time(opening + arrival)
+            for service, _, cost, _ in lines:
+                totals = by_service[service]
+                totals[0] += 1
+                totals[1] += cost
+            revenue += total
+            if writer:
+                writer.writerows([number, name, arrival, service, role, duration, cost]
+                                 for service, role, cost, duration in lines)
+            else:
+                file.write(json.dumps({"invoice": number, "customer": name, "arrival": arrival, "total": total,
+                                       "lines": [{"service": service, "role": role,
+                                                  "duration": duration, "cost": cost}
+                                                 for service, role, cost, duration in lines]}) + "\n")
+
+    with open(ledger_path, "w", newline="", encoding="utf-8") as file:
+        if fmt == "csv":
+            writer = csv.writer(file)
+            writer.writerow(["service", "count", "revenue"])
+            writer.writerows([service, count, amount] for service, (count, amount) in sorted(by_service.items()))
+            writer.writerow(["TOTAL", invoices, revenue])
+        else:
+            json.dump({"branch": branch.name, "day": day.isoformat(), "invoices": invoices, "revenue": revenue,
+                       "by_service": {service: {"count": count, "revenue": amount}
+                                      for service, (count, amount) in sorted(by_service.items())}},
+                      file, indent=1)
+
+    return {"branch": branch.name, "day": day.isoformat(), "invoices": invoices, "revenue": revenue,
+            "files": [invoice_path, ledger_path]}
+
+
+def _close_branch(job):
+    return close_branch_day(*job)
+
+
+def close_branches(jobs, out_dir, day=None, fmt="csv", executor=None):
+    # jobs is [(branch, customers)]. A single branch closes in-process;
+    # several fan out one per worker, like schedule_branches.
+    day = day or date.today()
+    # Plain rows pickle cheaply and keep the catalogue proxies out of the workers
+    jobs = [(branch, [_billing_row(customer) for customer in customers], out_dir, day, fmt)
+            for branch, customers in jobs]
+    if executor is None and len(jobs) <= 1:
+        return [_close_branch(job) for job in jobs]
+    if executor is None:
+        with ProcessPoolExecutor() as pool:
+            return list(pool.map(_close_branch, jobs))
+    return list(executor.map(_close_branch, jobs))
+
+
+# --------------------- Timeline Data -------------------------
+def _timeline_layer(blocks):
+    # Sorted, non-overlapping (start, end, text) blocks as parallel lists, so a
+    # visible time window can be found with bisect
+    blocks.sort()
+    return ([start for start, _, _ in blocks], [end for _, end, _ in blocks], [text for _, _, text in blocks])
+
+
+def timeline_rows(branches, start_date, days, customers_by_branch=None):
+    # One row per staff member per branch (work, break and packed service
+    # blocks) plus one row per scheduled customer. Times are minutes from
+    # midnight of start_date.
+    rows = []
+    for branch in branches:
+        members = {}  # (role, member) -> {kind: [(start, end, text)]}
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            for role, role_roster in branch.staff.roster_for_day(day).items():
+                for member, slots in branch.staff.iter_role_roster(role_roster):
+                    blocks = members.setdefault((role, member), {"Work": [], "Break": [], "Service": []})
+                    for pos in range(0, len(slots), 2):
+                        if slots[pos] != StaffManager._NO_SLOT:
+                            kind = StaffManager._SLOT_KINDS[(pos // 2) % 2]
+                            blocks[kind].append((offset * 24 * 60 + slots[pos], offset * 24 * 60 + slots[pos + 1],
+                                                 "Break" if kind == "Break" else ""))
+
+        customers = (customers_by_branch or {}).get(branch.name, [])
+        if customers:
+            # Packed on copies so the booking screen's own schedule is left alone
+            packer = AppointmentPacker(branch, start_date)
+            report = packer.pack([copy.copy(customer) for customer in customers], local_search=False)
+            for customer, service, role, member, start, end in report["placements"]:
+                members.setdefault((role, member), {"Work": [], "Break": [], "Service": []})["Service"].append(
+                    (start, end, f"{customer.name}: {service}"))
+
+        for (role, member), blocks in members.items():
+            rows.append({"label": f"{branch.name} \u00b7 {member} ({role})",
+                         "blocks": {kind: _timeline_layer(kind_blocks) for kind, kind_blocks in blocks.items()}})
+
+        opening = branch.staff.shift_start
+        for customer in customers:
+            if customer.end_time > customer.start_time:
+                rows.append({"label": f"{branch.name} \u00b7 {customer.name}",
+                             "blocks": {"Booking": _timeline_layer([(opening + customer.start_time,
+                                                                     opening + customer.end_time,
+                                                                     ", ".join(customer.services))])}})
+    return rows
+
+
+# --------------------- Performance Harness -------------------------
+def _member_loop_schedule(staff_manager, day=None):
+    # The original one-member-at-a-time schedule loop with its running break
+    # offset, kept as an independent baseline engine for the harness. Like
+    # the original it assumes one shift length for everybody; members may
+    # still start at different times or take days off.
+    snapshot = staff_manager.snapshot()
+    weekday = (day or date.today()).weekday()
+    breaks = snapshot.breaks_per_shift
+    total_work_minutes = int(snapshot.shift_duration * 60)
+    break_interval = total_work_minutes // (breaks + 1)
+    schedule = {}
+
+    for role, members in snapshot.staff.items():
+        if not members:  # Skip if no staff in this role
+            continue
+
+        role_schedule = {}
+
+        # Calculate staggered break offsets for first break
+        break_offset = break_interval  # Start breaks after first work period
+        break_offset_increment = break_interval // max(1, len(members))
+
+        for member in members:
+            start, _, days_off = staff_manager.get_member_shift(member, snapshot)
+            first_break_offset = break_offset
+
+            # Update break offset for next staff member
+            break_offset = (break_offset + break_offset_increment) % break_interval
+            if weekday in days_off:
+                continue
+
+            shifts = []
+            current_time = start
+            shift_end = start + total_work_minutes
+
+            # First work period before first break
+            first_break_time = current_time + first_break_offset
+            if current_time < first_break_time:
+                shifts.append(("Work", current_time, first_break_time))
+
+            # First break
+            break_end = first_break_time + int(snapshot.break_duration * 60)
+            shifts.append(("Break", first_break_time, break_end))
+            current_time = break_end
+
+            # Remaining work periods and breaks
+            remaining_work_time = shift_end - current_time
+            remaining_break_interval = remaining_work_time // breaks
+
+            for i in range(1, breaks + 1):
+                work_end = current_time + remaining_break_interval
+                if current_time < work_end:
+                    shifts.append(("Work", current_time, work_end))
+
+                if i < breaks and work_end < shift_end:
+                    break_start = work_end
+                    break_end = break_start + int(snapshot.break_duration * 60)
+                    shifts.append(("Break", break_start, break_end))
+                    current_time = break_end
+
+            role_schedule[member] = shifts
+
+        schedule[role] = role_schedule
+
+    return schedule
+
+
+def _roster_schedule(staff_manager, day=None):
+    # roster_for_day's dense slots read back as shifts, so the batch path the
+    # packer and the timeline use is checked against the same baseline
+    day = day or date.today()
+    return {role: {member: staff_manager.slots_to_shifts(slots)
+                   for member, slots in staff_manager.iter_role_roster(role_roster)}
+            for role, role_roster in staff_manager.roster_for_day(day).items()}
+
+
+class PerfHarness:
+    # Runs each task's reference engine and every registered alternative on
+    # the same seeded inputs, checks their results match the reference and
+    # records best-of-repeat time and peak traced memory per input size.
+    # Inputs are rebuilt from the seed, so reports from different commits
+    # compare like for like (input_digest says so).
+    TASKS = ("fcfs", "priority_scheduling", "generate_schedule")
+
+    def __init__(self, sizes=(100, 1000, 10000), seed=0, repeat=3, branch=None):
+        self.sizes = sizes
+        self.seed = seed
+        self.repeat = repeat
+        self.branch = branch or Branch.get()
+        self.engines = {
+            "fcfs": {"reference": fcfs},
+            "priority_scheduling": {"reference": priority_scheduling},
+            "generate_schedule": {"reference": StaffManager.generate_schedule,
+                                  "member_loop": _member_loop_schedule,
+                                  "roster_for_day": _roster_schedule},
+        }
+
+    def register(self, task, name, engine):
+        # fcfs/priority engines take a customer list; schedule engines take (staff_manager, day)
+        if task not in self.engines:
+            raise ValueError(f"Unknown task: {task}")
+        self.engines[task][name] = engine
+
+    def _spec(self, task, size):
+        rng = random.Random(f"{self.seed}-{task}-{size}")
+        if task == "generate_schedule":
+            roles = list(self.branch.staff.get_staff_roles())
+            staff = defaultdict(list)
+            shifts = {}
+            for i in range(size):
+                name = f"Staff {i}"
+                staff[roles[i % len(roles)]].append(name)
+                if rng.random() < 0.3:
+                    # Start times and days off only: the member_loop baseline keeps
+                    # the original's single shift length
+                    shifts[name] = (rng.choice((7, 8, 9, 10, 11)) * 60, None,
+                                    sorted(rng.sample(range(7), rng.randint(0, 2))))
+            return {"staff": dict(staff), "shifts": shifts, "day": date(2024, 1, 1 + rng.randrange(7)).isoformat()}
+        services = sorted(self.branch.services.get_service_names())
+        return {"customers": [(f"Customer {i}", rng.sample(services, rng.randint(1, min(3, len(services)))),
+                               rng.randrange(8 * 60)) for i in range(size)]}
+
+    def _build(self, task, spec):
+        # Fresh objects for every run, since the schedulers mutate customers
+        if task == "generate_schedule":
+            staff_manager = StaffManager(spec["staff"])
+            for name, (start, duration, days_off) in spec["shifts"].items():
+                staff_manager.set_member_shift(name, start, duration, days_off)
+            return (staff_manager, date.fromisoformat(spec["day"]))
+        return ([Customer(name, services, arrival, self.branch.services)
+                 for name, services, arrival in spec["customers"]],)
+
+    def _result(self, task, output):
+        if task == "generate_schedule":
+            return {role: {member: [tuple(shift) for shift in shifts] for member, shifts in members.items()}
+                    for role, members in output.items()}
+        return [(customer.name, customer.start_time, customer.end_time, customer.waiting_time) for customer in output]
+
+    def _measure(self, task, engine, spec):
+        seconds = float("inf")
+        for _ in range(self.repeat):
+            args = self._build(task, spec)
+            start = perf_counter()
+            output = engine(*args)
+            seconds = min(seconds, perf_counter() - start)
+
+        args = self._build(task, spec)
+        tracemalloc.start()
+        try:
+            engine(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return self._result(task, output), seconds, peak
+
+    def run(self, tasks=None, label=""):
+        results = []
+        for task in tasks or self.TASKS:
+            for size in self.sizes:
+                spec = self._spec(task, size)
+                digest = hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+                expected, ref_seconds, ref_peak = self._measure(task, self.engines[task]["reference"], spec)
+                for name, engine in self.engines[task].items():
+                    if name == "reference":
+                        output, seconds, peak = expected, ref_seconds, ref_peak
+                    else:
+                        output, seconds, peak = self._measure(task, engine, spec)
+                    results.append({"task": task, "engine": name, "size": size, "input_digest": digest,
+                                    "equivalent": output == expected,
+                                    "seconds": seconds, "peak_bytes": peak,
+                                    "time_ratio": seconds / ref_seconds if ref_seconds else None,
+                                    "memory_ratio": peak / ref_peak if ref_peak else None})
+        return {"label": label, "seed": self.seed, "sizes": list(self.sizes), "repeat": self.repeat,
+                "python": sys.version.split()[0], "results": results}
+
+    def write_report(self, path, tasks=None, label=""):
+        report = self.run(tasks, label)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=1)
+        return report
+
+
 # --------------------- GUI Screens -------------------------
 class HomeScreen(QWidget):
     def __init__(self, parent):
@@ -259,9 +2186,17 @@ class HomeScreen(QWidget):
         btn_staff = self.create_cute_button("Staff Scheduling", "#5CB85C")
         btn_staff.clicked.connect(lambda: parent.setCurrentIndex(3))
 
+        btn_timeline = self.create_cute_button("Schedule Timeline", "#9B7FD1")
+        btn_timeline.clicked.connect(lambda: parent.setCurrentIndex(4))
+
+        btn_dashboard = self.create_cute_button("Revenue Dashboard", "#F0A04B")
+        btn_dashboard.clicked.connect(lambda: parent.setCurrentIndex(5))
+
         button_layout.addWidget(btn_booking)
         button_layout.addWidget(btn_service)
         button_layout.addWidget(btn_staff)
+        button_layout.addWidget(btn_timeline)
+        button_layout.addWidget(btn_dashboard)
 
         layout.addStretch(1)
         layout.addWidget(button_container)
@@ -297,8 +2232,15 @@ class BookingScreen(QWidget):
     def __init__(self, parent):
         super().__init__()
         self.parent = parent
-        self.customers = []
+        # Shared with the booking service when one is running, so other terminals' bookings show up too
+        self.customers = parent.booking_service.customers if parent.booking_service else list(parent.restored_customers)
         self.current_services = []  # To store services for current customer
+        self.scheduled_customers = []  # Rows of the results table
+        self.schedule_rows = []  # Last schedule, shown again when the search box is cleared
+        self.wait_estimator = WaitEstimator(parent.branch.staff)
+        if not parent.booking_service:  # the service seeds its own estimator
+            for customer in sorted(self.customers, key=lambda x: x.arrival_time):
+                self.wait_estimator.add(customer)
         layout = QVBoxLayout()
 
         # Set cute background
@@ -328,7 +2270,7 @@ class BookingScreen(QWidget):
         """)
 
         self.service_box = QComboBox()
-        self.service_box.addItems(ServiceManager.get_service_names())
+        self.service_box.addItems(self.parent.branch.services.get_service_names())
         self.service_box.setStyleSheet("""
             QComboBox {
                 padding: 8px;
@@ -351,6 +2293,25 @@ class BookingScreen(QWidget):
         """)
         self.add_service_btn.clicked.connect(self.add_service_to_list)
 
+        # Returning customers: show their usual booking and rebook it in one click
+        self.name_input.editingFinished.connect(self.show_profile)
+        self.profile_label = QLabel()
+        self.profile_label.setStyleSheet("color: #6B5B95;")
+        self.rebook_btn = QPushButton("Rebook Usual")
+        self.rebook_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #CDB4DB;
+                color: #333333;
+                border-radius: 5px;
+                padding: 8px;
+            }
+            QPushButton:hover {
+                background-color: #B89FC6;
+            }
+        """)
+        self.rebook_btn.setEnabled(False)
+        self.rebook_btn.clicked.connect(self.rebook_usual)
+
         self.selected_services_list = QListWidget()
         self.selected_services_list.setStyleSheet("""
             QListWidget {
@@ -361,6 +2322,7 @@ class BookingScreen(QWidget):
         """)
 
         form_layout.addRow("Name:", self.name_input)
+        form_layout.addRow(self.profile_label, self.rebook_btn)
         form_layout.addRow("Service:", self.service_box)
         form_layout.addRow(self.add_service_btn)
         form_layout.addRow("Selected Services:", self.selected_services_list)
@@ -375,14 +2337,36 @@ class BookingScreen(QWidget):
         schedule_btn = self.create_button("View Schedule", "#FFB7B2")
         schedule_btn.clicked.connect(self.view_schedule)
 
+        cancel_btn = self.create_button("Cancel Selected", "#EF476F")
+        cancel_btn.clicked.connect(self.cancel_booking)
+
+        close_day_btn = self.create_button("Close Day", "#CDB4DB")
+        close_day_btn.clicked.connect(self.close_day)
+
         home_btn = self.create_button("Back to Home", "#E2F0CB")
         home_btn.clicked.connect(lambda: parent.setCurrentIndex(0))
 
         btn_layout.addWidget(confirm_btn)
         btn_layout.addWidget(schedule_btn)
+        btn_layout.addWidget(cancel_btn)
+        btn_layout.addWidget(close_day_btn)
         btn_layout.addWidget(home_btn)
         layout.addLayout(btn_layout)
 
+        # Search as you type over the booking index
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search by customer, service or arrival (10:00-11:30)")
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                background-color: white;
+                border: 1px solid #FFB6C1;
+                border-radius: 5px;
+                padding: 5px;
+            }
+        """)
+        self.search_input.textChanged.connect(self.search_bookings)
+        layout.addWidget(self.search_input)
+
         # Results table
         self.table = QTableWidget()
         self.table.setColumnCount(6)
@@ -430,6 +2414,31 @@ class BookingScreen(QWidget):
             self.current_services.append(service)
             self.selected_services_list.addItem(service)
 
+    def show_profile(self):
+        profile = self.parent.profiles.get(self.name_input.text())
+        self.rebook_btn.setEnabled(profile is not None)
+        if profile is None:
+            self.profile_label.clear()
+            return
+        self.profile_label.setText(
+            f"Usual: {', '.join(profile.services)} - Rs. {profile.total_cost} ({profile.total_duration} mins), "
+            f"{profile.visits} visit(s), last at "
+            f"{StaffManager.format_time(self.parent.branch.staff.shift_start + profile.last_visit)}")
+
+    def rebook_usual(self):
+        profile = self.parent.profiles.get(self.name_input.text())
+        if profile is None:
+            return
+        self.name_input.setText(profile.name)
+        self.current_services = list(profile.services)
+        self.selected_services_list.clear()
+        self.selected_services_list.addItems(profile.services)
+
+    def minutes_since_opening(self):
+        # Wall-clock time on the estimator's scale, so queued work drains as the day goes on
+        clock = datetime.now()
+        return max(0, clock.hour * 60 + clock.minute - self.parent.branch.staff.shift_start)
+
     def confirm_booking(self):
         name = self.name_input.text().strip()
         if not name:
@@ -441,22 +2450,45 @@ class BookingScreen(QWidget):
             return
 
         # Create customer with all selected services
-        self.customers.append(Customer(name, self.current_services.copy()))
-
-        # Generate bill
-        customer = self.customers[-1]
-        bill_details = f"Customer: {name}\nServices:\n"
-        for service in customer.services:
-            service_data = ServiceManager.get_service(service)
-            bill_details += f"- {service}: Rs. {service_data['cost']} ({service_data['duration']} mins)\n"
-
-        bill_details += f"\nTotal Cost: Rs. {customer.total_cost}"
+        if self.parent.booking_service:
+            # The booking service owns self.customers and quotes the wait
+            try:
+                customer, _ = self.parent.booking_service.submit_threadsafe(
+                    name, self.current_services.copy()).result(timeout=5)
+            except Exception as error:  # rejected, failed or timed out; nothing was booked
+                QMessageBox.warning(self, "Error", str(error) or "The booking service did not respond!")
+                return
+            waiting_time = customer.quoted_wait
+        else:
+            customer = Customer(name, self.current_services.copy(), service_manager=self.parent.branch.services)
+            self.customers.append(customer)
+            self.parent.rollup.record(customer)
+            self.parent.booking_index.add(customer)
+            self.parent.profiles.refresh(customer)
+            now = self.minutes_since_opening()
+            waiting_time = self.wait_estimator.estimate(customer, now)
+            self.wait_estimator.add(customer, now)
+            if self.parent.journal:
+                self.parent.journal.record_booking(customer)
+                self.parent.journal.commit()
+                self.parent.journal.maybe_compact(self.parent.branch, self.customers)
+
+        # Generate bill from the prices the customer was booked at
+        bill_details = "\n".join([
+            f"Customer: {name}", "Services:",
+            *(f"- {service}: Rs. {service_data['cost']} ({service_data['duration']} mins)"
+              for service, service_data in zip(customer.services, customer.service_data)),
+            "",
+            f"Total Cost: Rs. {customer.total_cost}",
+            f"Estimated Wait: {waiting_time} mins"])
         QMessageBox.information(self, "Booking Confirmed", bill_details)
 
         # Reset form
         self.name_input.clear()
         self.current_services.clear()
         self.selected_services_list.clear()
+        self.profile_label.clear()
+        self.rebook_btn.setEnabled(False)
 
 
     def view_schedule(self):  
@@ -469,7 +2501,9 @@ class BookingScreen(QWidget):
             self,
             "Choose Scheduling Algorithm",
             "Select one:",
-            ["FCFS (First Come First Serve)", "Priority Scheduling"],
+            ["FCFS (First Come First Serve)", "Priority Scheduling",
+             "SJF (Shortest Job First)", "SRTF (Shortest Remaining Time First)",
+             "Makespan Packing (pre-booked day)"],
             0,
             False
         )
@@ -479,19 +2513,114 @@ class BookingScreen(QWidget):
 
         if algorithm.startswith("FCFS"):
             scheduled_customers = fcfs(self.customers)
+        elif algorithm.startswith("SJF"):
+            scheduled_customers = sjf(self.customers)
+        elif algorithm.startswith("SRTF"):
+            scheduled_customers = srtf(self.customers)
+        elif algorithm.startswith("Makespan"):
+            report = AppointmentPacker(self.parent.branch).pack(self.customers)
+            scheduled_customers = sorted(self.customers, key=lambda x: x.start_time)
+
+            # The packer decides who serves what, so staff revenue follows it
+            assigned = defaultdict(dict)
+            for customer, service, _, member, _, _ in report["placements"]:
+                assigned[id(customer)].setdefault(service, []).append(member)
+            for customer in self.customers:
+                members = assigned[id(customer)]
+                self.parent.rollup.assign_staff(customer, [members[service].pop(0) if members.get(service)
+                                                           else RevenueRollup.UNASSIGNED
+                                                           for service in customer.services])
+            QMessageBox.information(
+                self, "Packing Report",
+                f"Makespan: {report['makespan']} mins (arrival order: {report['arrival_order_makespan']} mins, "
+                f"FCFS: {report['fcfs_makespan']} mins)\n"
+                f"Idle staff time: {report['idle']} mins (arrival order: {report['arrival_order_idle']} mins)")
         else:
             scheduled_customers = priority_scheduling(self.customers)
 
-        self.table.setRowCount(len(scheduled_customers))
+        self.schedule_rows = list(scheduled_customers)
+        self.show_customers(scheduled_customers)
+
+    def search_bookings(self, text):
+        if not text.strip():
+            self.show_customers(self.schedule_rows)
+            return
+        self.show_customers(self.parent.booking_index.search(text))
+
+    def show_customers(self, customers):
+        self.scheduled_customers = list(customers)
+        self.table.setRowCount(len(self.scheduled_customers))
 
-        for row, customer in enumerate(scheduled_customers):
+        # Schedule times are minutes after the salon opens
+        opening = self.parent.branch.staff.shift_start
+        for row, customer in enumerate(self.scheduled_customers):
             self.table.setItem(row, 0, QTableWidgetItem(customer.name))
             self.table.setItem(row, 1, QTableWidgetItem(", ".join(customer.services)))
-            self.table.setItem(row, 2, QTableWidgetItem(str(customer.start_time)))
-            self.table.setItem(row, 3, QTableWidgetItem(str(customer.end_time)))
+            self.table.setItem(row, 2, QTableWidgetItem(StaffManager.format_time(opening + customer.start_time)))
+            self.table.setItem(row, 3, QTableWidgetItem(StaffManager.format_time(opening + customer.end_time)))
             self.table.setItem(row, 4, QTableWidgetItem(f"{customer.waiting_time} mins"))
             self.table.setItem(row, 5, QTableWidgetItem(f"Rs. {customer.total_cost}"))
 
+    def cancel_booking(self):
+        row = self.table.currentRow()
+        if row < 0 or row >= len(self.scheduled_customers):
+            QMessageBox.warning(self, "Error", "Please select a booking to cancel!")
+            return
+
+        customer = self.scheduled_customers[row]
+        index = next((i for i, booked in enumerate(self.customers) if booked is customer), None)
+        if index is None:
+            QMessageBox.warning(self, "Error", "This booking was already cancelled!")
+            return
+
+        reply = QMessageBox.question(self, 'Confirm Cancel',
+                                     f"Are you sure you want to cancel {customer.name}'s booking?",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+
+        if self.parent.booking_service:
+            # The service thread may be appending or compacting meanwhile
+            if not self.parent.booking_service.cancel(customer):
+                QMessageBox.warning(self, "Error", "This booking was already cancelled!")
+                return
+        else:
+            if self.parent.journal:
+                self.parent.journal.record_cancel(index)
+                self.parent.journal.commit()
+            del self.customers[index]
+            self.wait_estimator.remove(customer, self.minutes_since_opening())
+        self.parent.rollup.cancel(customer)
+        self.parent.booking_index.remove(customer)
+        self.parent.profiles.refresh(customer)
+
+        del self.scheduled_customers[row]
+        self.schedule_rows = [booked for booked in self.schedule_rows if booked is not customer]
+        self.table.removeRow(row)
+        self.show_profile()  # the usual booking on show may have been this one
+
+    def close_day(self):
+        if not self.customers:
+            QMessageBox.warning(self, "Error", "No bookings yet!")
+            return
+
+        out_dir = QFileDialog.getExistingDirectory(self, "Save Invoices and Ledger To")
+        if not out_dir:
+            return
+
+        fmt, ok = QInputDialog.getItem(self, "Close Day", "File format:", ["csv", "json"], 0, False)
+        if not ok:
+            return
+
+        try:
+            result, = close_branches([(self.parent.branch, list(self.customers))], out_dir, fmt=fmt)
+        except OSError as error:
+            QMessageBox.warning(self, "Error", str(error))
+            return
+        QMessageBox.information(self, "Day Closed",
+                                f"Invoices: {result['invoices']}\nRevenue: Rs. {result['revenue']}\n\n"
+                                + "\n".join(result["files"]))
+
 class ServiceScreen(QWidget):
     def __init__(self, parent):
         super().__init__()
@@ -540,9 +2669,17 @@ class ServiceScreen(QWidget):
         delete_btn = self.create_button("Delete Service", "#EF476F")
         delete_btn.clicked.connect(self.delete_service)
 
+        import_btn = self.create_button("Import", "#B5EAD7")
+        import_btn.clicked.connect(self.import_services)
+
+        export_btn = self.create_button("Export", "#CDB4DB")
+        export_btn.clicked.connect(self.export_services)
+
         btn_layout.addWidget(add_btn)
         btn_layout.addWidget(update_btn)
         btn_layout.addWidget(delete_btn)
+        btn_layout.addWidget(import_btn)
+        btn_layout.addWidget(export_btn)
         layout.addLayout(btn_layout)
 
         # Services table
@@ -594,16 +2731,18 @@ class ServiceScreen(QWidget):
         return color.darker(int(100 * factor)).name()
 
     def load_services(self):
-        services = ServiceManager.get_services()
+        services = self.parent.branch.services.get_services()
+        self.services_table.setUpdatesEnabled(False)  # repaint once, not per cell
         self.services_table.setRowCount(len(services))
 
         for row, (name, details) in enumerate(services.items()):
             self.services_table.setItem(row, 0, QTableWidgetItem(name))
             self.services_table.setItem(row, 1, QTableWidgetItem(f"Rs. {details['cost']}"))
+        self.services_table.setUpdatesEnabled(True)
 
     def service_selected(self, row, col):
         name = self.services_table.item(row, 0).text()
-        service = ServiceManager.get_service(name)
+        service = self.parent.branch.services.get_service(name)
         if service:
             self.service_name.setText(name)
             self.service_cost.setValue(service["cost"])
@@ -616,14 +2755,15 @@ class ServiceScreen(QWidget):
             QMessageBox.warning(self, "Error", "Please enter a service name!")
             return
 
-        if name in ServiceManager.get_services():
+        if name in self.parent.branch.services.get_services():
             QMessageBox.warning(self, "Error", "Service already exists! Use Update instead.")
             return
 
         # Default duration and priority for new services
         duration = 5
         priority = 3
-        ServiceManager.add_service(name, cost, duration, priority)
+        self.parent.branch.services.add_service(name, cost, duration, priority)
+        self.record_service(name)
         self.load_services()
         self.update_booking_services()
         QMessageBox.information(self, "Success", "Service added successfully!")
@@ -638,15 +2778,16 @@ class ServiceScreen(QWidget):
             QMessageBox.warning(self, "Error", "Please select a service to update!")
             return
 
-        if name not in ServiceManager.get_services():
+        if name not in self.parent.branch.services.get_services():
             QMessageBox.warning(self, "Error", "Service doesn't exist! Use Add instead.")
             return
 
         # Keep existing duration and priority when updating
-        service = ServiceManager.get_service(name)
+        service = self.parent.branch.services.get_service(name)
         duration = service["duration"] if service else 5
         priority = service["priority"] if service else 3
-        ServiceManager.update_service(name, cost, duration, priority)
+        self.parent.branch.services.update_service(name, cost, duration, priority)
+        self.record_service(name)
         self.load_services()
         self.update_booking_services()
         QMessageBox.information(self, "Success", "Service updated successfully!")
@@ -659,7 +2800,7 @@ class ServiceScreen(QWidget):
             QMessageBox.warning(self, "Error", "Please select a service to delete!")
             return
 
-        if name not in ServiceManager.get_services():
+        if name not in self.parent.branch.services.get_services():
             QMessageBox.warning(self, "Error", "Service doesn't exist!")
             return
 
@@ -668,16 +2809,72 @@ class ServiceScreen(QWidget):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            ServiceManager.delete_service(name)
+            self.parent.branch.services.delete_service(name)
+            if self.parent.journal:
+                self.parent.journal.record_service_delete(name)
+                self.parent.journal.commit()
             self.load_services()
             self.update_booking_services()
             QMessageBox.information(self, "Success", "Service deleted successfully!")
             self.clear_form()
 
+    def record_service(self, name):
+        if self.parent.journal:
+            services = self.parent.branch.services
+            self.parent.journal.record_service(name, services.get_service(name), services.get_service_role(name))
+            self.parent.journal.commit()
+
+    def import_services(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Services", "",
+                                              "Service lists (*.csv *.json *.jsonl)")
+        if not path:
+            return
+
+        reply = QMessageBox.question(self, 'Replace Catalogue',
+                                     "Remove services that are not in the file?",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        services = self.parent.branch.services
+        try:
+            diff = services.import_services(services.read_service_file(path), replace=reply == QMessageBox.Yes)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Error", str(error))
+            return
+
+        if self.parent.journal:
+            snapshot = services.snapshot()
+            try:
+                for name in diff["added"] + diff["updated"]:
+                    self.parent.journal.record_service(name, snapshot.get_service(name),
+                                                       snapshot.get_service_role(name))
+                for name in diff["removed"]:
+                    self.parent.journal.record_service_delete(name)
+            except ValueError as error:
+                QMessageBox.warning(self, "Error", f"Imported, but not all changes could be journaled: {error}")
+            self.parent.journal.commit()
+
+        # One refresh for the whole file
+        self.load_services()
+        self.update_booking_services()
+        QMessageBox.information(self, "Import Complete",
+                                f"Added: {len(diff['added'])}\nUpdated: {len(diff['updated'])}\n"
+                                f"Removed: {len(diff['removed'])}\nUnchanged: {diff['unchanged']}")
+
+    def export_services(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Services", "services.csv",
+                                              "CSV (*.csv);;JSON (*.json);;JSON Lines (*.jsonl)")
+        if not path:
+            return
+        try:
+            count = self.parent.branch.services.export_services(path)
+        except OSError as error:
+            QMessageBox.warning(self, "Error", str(error))
+            return
+        QMessageBox.information(self, "Export Complete", f"Exported {count} services to {path}")
+
     def update_booking_services(self):
         booking_screen = self.parent.widget(1)
         booking_screen.service_box.clear()
-        booking_screen.service_box.addItems(ServiceManager.get_service_names())
+        booking_screen.service_box.addItems(self.parent.branch.services.get_service_names())
 
     def clear_form(self):
         self.service_name.clear()
@@ -747,7 +2944,7 @@ class StaffSchedulingScreen(QWidget):
 
         # Stylish combo box
         self.role_box = QComboBox()
-        self.role_box.addItems(StaffManager.get_staff_roles())
+        self.role_box.addItems(self.parent.branch.staff.get_staff_roles())
         self.role_box.setStyleSheet("""
             QComboBox {
                 padding: 8px;
@@ -968,7 +3165,7 @@ class StaffSchedulingScreen(QWidget):
     def update_staff_members(self):
         role = self.role_box.currentText()
         self.staff_list.clear()
-        self.staff_list.addItems(StaffManager.get_staff_members(role))
+        self.staff_list.addItems(self.parent.branch.staff.get_staff_members(role))
 
     def add_staff_member(self):
         role = self.role_box.currentText()
@@ -978,7 +3175,10 @@ class StaffSchedulingScreen(QWidget):
             QMessageBox.warning(self, "Error", "Please enter staff name!")
             return
 
-        if StaffManager.add_staff_member(role, name):
+        if self.parent.branch.staff.add_staff_member(role, name):
+            if self.parent.journal:
+                self.parent.journal.record_staff(role, name)
+                self.parent.journal.commit()
             self.update_staff_members()
             self.staff_name.clear()
             QMessageBox.information(self, "Success", f"{name} added to {role} role!")
@@ -999,58 +3199,423 @@ class StaffSchedulingScreen(QWidget):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            if StaffManager.remove_staff_member(role, name):
+            if self.parent.branch.staff.remove_staff_member(role, name):
+                if self.parent.journal:
+                    self.parent.journal.record_staff(role, name, added=False)
+                    self.parent.journal.commit()
                 self.update_staff_members()
                 QMessageBox.information(self, "Success", f"{name} removed from {role} role!")
             else:
                 QMessageBox.warning(self, "Error", f"Failed to remove {name} from {role}!")
 
     def generate_schedule(self):
-        # Update class variables with current GUI values
-        StaffManager._shift_duration = self.shift_duration.value()
-        StaffManager._break_duration = self.break_duration.value() / 60  # Convert to hours
-
-        schedule = StaffManager.generate_schedule()
-        self.schedule_table.setRowCount(0)  # Clear table
-
-        row = 0
-        for role, staff_schedule in schedule.items():
-            for staff, shifts in staff_schedule.items():
-                # Filter out breaks and work periods
-                work_shifts = [s for s in shifts if s[0] == "Work"]
-                break_shifts = [s for s in shifts if s[0] == "Break"]
-
-                # Format shift times
-                if work_shifts:
-                    start_time = StaffManager.format_time(work_shifts[0][1])
-                    end_time = StaffManager.format_time(work_shifts[-1][2])
-                    shift_time = f"{start_time} - {end_time}"
-                else:
-                    shift_time = "Not scheduled"
-
-                # Format break times
-                break_times = []
-                for b in break_shifts:
-                    start = StaffManager.format_time(b[1])
-                    end = StaffManager.format_time(b[2])
-                    break_times.append(f"{start}-{end}")
-                break_str = "\n".join(break_times) if break_times else "No breaks"
-
-                # Add to table
-                self.schedule_table.insertRow(row)
-                self.schedule_table.setItem(row, 0, QTableWidgetItem(role))
-                self.schedule_table.setItem(row, 1, QTableWidgetItem(staff))
-                self.schedule_table.setItem(row, 2, QTableWidgetItem(shift_time))
-                self.schedule_table.setItem(row, 3, QTableWidgetItem(break_str))
-                row += 1
+        # Update the branch's shift settings with current GUI values
+        staff_manager = self.parent.branch.staff
+        shift_start = self.shift_start.time()
+        staff_manager.set_shift_settings(start=shift_start.hour() * 60 + shift_start.minute(),
+                                         duration=self.shift_duration.value(),
+                                         break_duration=self.break_duration.value() / 60)  # Convert to hours
+
+        roster = staff_manager.roster_for_day(date.today())
+        self.parent.rollup.record_roster(date.today(), roster)
+        rows = [(role, staff, slots) for role, role_roster in roster.items()
+                for staff, slots in staff_manager.iter_role_roster(role_roster)]
+        self.schedule_table.setRowCount(len(rows))
+
+        no_slot = StaffManager._NO_SLOT
+        for row, (role, staff, slots) in enumerate(rows):
+            # Even slot pairs are work periods, odd ones are breaks
+            work_starts = [slots[pos] for pos in range(0, len(slots), 4) if slots[pos] != no_slot]
+            work_ends = [slots[pos + 1] for pos in range(0, len(slots), 4) if slots[pos] != no_slot]
+
+            # Format shift times
+            if work_starts:
+                start_time = StaffManager.format_time(work_starts[0])
+                end_time = StaffManager.format_time(work_ends[-1])
+                shift_time = f"{start_time} - {end_time}"
+            else:
+                shift_time = "Not scheduled"
+
+            # Format break times
+            break_times = [f"{StaffManager.format_time(slots[pos])}-{StaffManager.format_time(slots[pos + 1])}"
+                           for pos in range(2, len(slots), 4) if slots[pos] != no_slot]
+            break_str = "\n".join(break_times) if break_times else "No breaks"
+
+            # Add to table
+            self.schedule_table.setItem(row, 0, QTableWidgetItem(role))
+            self.schedule_table.setItem(row, 1, QTableWidgetItem(staff))
+            self.schedule_table.setItem(row, 2, QTableWidgetItem(shift_time))
+            self.schedule_table.setItem(row, 3, QTableWidgetItem(break_str))
 
         self.schedule_table.resizeRowsToContents()
 
 
-class GlamStationApp(QStackedWidget):
+class TimelineView(QGraphicsView):
+    # Gantt view that only keeps items for blocks inside the viewport. Items are
+    # created and dropped as the view scrolls, and when zoomed out blocks closer
+    # than a few pixels are merged and drawn without labels.
+    RULER_HEIGHT = 22
+    ROW_HEIGHT = 28
+    LABEL_WIDTH = 220
+    LABEL_MIN_WIDTH = 48  # narrower blocks get no text
+    DETAIL_PIXELS_PER_MINUTE = 0.5  # below this zoom blocks are merged
+    LAYERS = ("Work", "Break", "Service", "Booking")
+    COLORS = {"Work": "#E2F0CB", "Break": "#FFB7B2", "Service": "#A2D2FF", "Booking": "#DAB6FF"}
+
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("GlamStation ")
+        self.setScene(QGraphicsScene(self))
+        self.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        # Fixed label column and ruler are painted over the scene, so scrolling repaints the viewport
+        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        self.rows = []
+        self.minutes = 24 * 60
+        self.start_date = date.today()
+        self.pixels_per_minute = 2.0
+        self._items = {}
+        self._coarse = {}
+        self.horizontalScrollBar().valueChanged.connect(self.refresh_visible)
+        self.verticalScrollBar().valueChanged.connect(self.refresh_visible)
+
+    def set_rows(self, rows, minutes, start_date):
+        self.rows = rows
+        self.minutes = minutes
+        self.start_date = start_date
+        self._reset_items()
+
+    def _reset_items(self):
+        self.scene().clear()
+        self._items.clear()
+        self._coarse.clear()
+        self.scene().setSceneRect(0, 0, self.LABEL_WIDTH + self.minutes * self.pixels_per_minute,
+                                  self.RULER_HEIGHT + max(1, len(self.rows)) * self.ROW_HEIGHT)
+        self.refresh_visible()
+
+    def _coarse_layers(self, row):
+        key = (row, self.pixels_per_minute)
+        if key not in self._coarse:
+            merge_gap = 4 / self.pixels_per_minute
+            layers = {}
+            for kind, (starts, ends, _) in self.rows[row]["blocks"].items():
+                merged_starts, merged_ends = [], []
+                for start, end in zip(starts, ends):
+                    if merged_ends and start - merged_ends[-1] < merge_gap:
+                        merged_ends[-1] = max(merged_ends[-1], end)
+                    else:
+                        merged_starts.append(start)
+                        merged_ends.append(end)
+                layers[kind] = (merged_starts, merged_ends, [""] * len(merged_starts))
+            self._coarse[key] = layers
+        return self._coarse[key]
+
+    def _make_item(self, row, kind, start, end, text):
+        x = self.LABEL_WIDTH + start * self.pixels_per_minute
+        width = max(1.0, (end - start) * self.pixels_per_minute)
+        inset = 3 if kind in ("Work", "Break") else 7
+        y = self.RULER_HEIGHT + row * self.ROW_HEIGHT + inset
+        item = QGraphicsRectItem(x, y, width, self.ROW_HEIGHT - 2 * inset)
+        item.setBrush(QBrush(QColor(self.COLORS[kind])))
+        item.setPen(QPen(Qt.NoPen))
+        item.setZValue(self.LAYERS.index(kind))
+        if text and width >= self.LABEL_MIN_WIDTH:
+            item.setFlag(QGraphicsItem.ItemClipsChildrenToShape)
+            label = QGraphicsSimpleTextItem(text, item)
+            label.setFont(QFont('Arial', 7))
+            label.setPos(x + 3, y)
+        self.scene().addItem(item)
+        return item
+
+    def refresh_visible(self):
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        first_row = max(0, int((visible.top() - self.RULER_HEIGHT) // self.ROW_HEIGHT))
+        last_row = min(len(self.rows) - 1, int((visible.bottom() - self.RULER_HEIGHT) // self.ROW_HEIGHT))
+        first_minute = (visible.left() - self.LABEL_WIDTH) / self.pixels_per_minute
+        last_minute = (visible.right() - self.LABEL_WIDTH) / self.pixels_per_minute
+        detailed = self.pixels_per_minute >= self.DETAIL_PIXELS_PER_MINUTE
+
+        wanted = set()
+        for row in range(first_row, last_row + 1):
+            layers = self.rows[row]["blocks"] if detailed else self._coarse_layers(row)
+            for kind, (starts, ends, texts) in layers.items():
+                i = bisect_right(ends, first_minute)
+                while i < len(starts) and starts[i] < last_minute:
+                    key = (row, kind, i)
+                    wanted.add(key)
+                    if key not in self._items:
+                        self._items[key] = self._make_item(row, kind, starts[i], ends[i], texts[i])
+                    i += 1
+
+        for key in [key for key in self._items if key not in wanted]:
+            self.scene().removeItem(self._items.pop(key))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.refresh_visible()
+
+    def wheelEvent(self, event):
+        if not event.modifiers() & Qt.ControlModifier:
+            super().wheelEvent(event)
+            return
+        # Ctrl + wheel zooms the time axis, keeping the minute under the cursor in place
+        cursor_x = event.pos().x()
+        minute = (self.mapToScene(event.pos()).x() - self.LABEL_WIDTH) / self.pixels_per_minute
+        factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+        self.pixels_per_minute = min(8.0, max(0.05, self.pixels_per_minute * factor))
+        self._reset_items()
+        self.horizontalScrollBar().setValue(int(self.LABEL_WIDTH + minute * self.pixels_per_minute - cursor_x))
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        # Hour lines, or day lines when zoomed out
+        step = 60 if self.pixels_per_minute >= 0.5 else 24 * 60
+        painter.setPen(QPen(QColor("#EEEEEE")))
+        minute = max(0, int((rect.left() - self.LABEL_WIDTH) / self.pixels_per_minute) // step * step)
+        while minute <= self.minutes and self.LABEL_WIDTH + minute * self.pixels_per_minute <= rect.right():
+            x = self.LABEL_WIDTH + minute * self.pixels_per_minute
+            painter.drawLine(QPointF(x, rect.top()), QPointF(x, rect.bottom()))
+            minute += step
+
+    def drawForeground(self, painter, rect):
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        painter.save()
+
+        # Time ruler pinned to the top
+        ruler = QRectF(visible.left(), visible.top(), visible.width(), self.RULER_HEIGHT)
+        painter.fillRect(ruler, QColor("#6B5B95"))
+        painter.setPen(QColor("white"))
+        painter.setFont(QFont('Arial', 8))
+        step = 60 if self.pixels_per_minute >= 1 else (6 * 60 if self.pixels_per_minute >= 0.2 else 24 * 60)
+        minute = max(0, int((visible.left() - self.LABEL_WIDTH) / self.pixels_per_minute) // step * step)
+        while minute <= self.minutes and self.LABEL_WIDTH + minute * self.pixels_per_minute <= visible.right():
+            day = self.start_date + timedelta(days=minute // (24 * 60))
+            painter.drawText(QPointF(self.LABEL_WIDTH + minute * self.pixels_per_minute + 3, visible.top() + 15),
+                             f"{day.strftime('%a')} {StaffManager.format_time(minute)}")
+            minute += step
+
+        # Row labels pinned to the left
+        painter.fillRect(QRectF(visible.left(), visible.top(), self.LABEL_WIDTH, visible.height()), QColor("white"))
+        painter.setPen(QColor("#6B5B95"))
+        first_row = max(0, int((visible.top() - self.RULER_HEIGHT) // self.ROW_HEIGHT))
+        last_row = min(len(self.rows) - 1, int((visible.bottom() - self.RULER_HEIGHT) // self.ROW_HEIGHT))
+        for row in range(first_row, last_row + 1):
+            y = self.RULER_HEIGHT + row * self.ROW_HEIGHT
+            if y >= visible.top() + self.RULER_HEIGHT - self.ROW_HEIGHT / 2:
+                painter.drawText(QRectF(visible.left() + 6, y, self.LABEL_WIDTH - 12, self.ROW_HEIGHT),
+                                 Qt.AlignVCenter | Qt.AlignLeft, self.rows[row]["label"])
+        painter.fillRect(QRectF(visible.left(), visible.top(), self.LABEL_WIDTH, self.RULER_HEIGHT), QColor("#6B5B95"))
+        painter.restore()
+
+
+class TimelineScreen(QWidget):
+    def __init__(self, parent):
+        super().__init__()
+        self.parent = parent
+        layout = QVBoxLayout()
+
+        # Set cute background
+        self.setAutoFillBackground(True)
+        palette = self.palette()
+        palette.setColor(QPalette.Window, QColor(240, 248, 255))  # Alice blue background
+        self.setPalette(palette)
+
+        title = QLabel("\U0001f4c6 Schedule Timeline")
+        title.setFont(QFont('Arial', 20))
+        title.setStyleSheet("color: #6B5B95;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+
+        controls = QHBoxLayout()
+        self.days = QSpinBox()
+        self.days.setRange(1, 28)
+        self.days.setValue(7)
+        self.days.setSuffix(" days")
+        self.days.setStyleSheet("padding: 8px; border-radius: 5px; border: 1px solid #CCCCCC;")
+
+        refresh_btn = self.create_button("Refresh", "#B5EAD7")
+        refresh_btn.clicked.connect(self.refresh)
+
+        home_btn = self.create_button("Back to Home", "#E2F0CB")
+        home_btn.clicked.connect(lambda: parent.setCurrentIndex(0))
+
+        hint = QLabel("Ctrl + mouse wheel to zoom")
+        hint.setStyleSheet("color: #888888;")
+
+        controls.addWidget(QLabel("Show:"))
+        controls.addWidget(self.days)
+        controls.addWidget(refresh_btn)
+        controls.addStretch(1)
+        controls.addWidget(hint)
+        controls.addWidget(home_btn)
+        layout.addLayout(controls)
+
+        self.view = TimelineView()
+        layout.addWidget(self.view)
+
+        self.setLayout(layout)
+
+    def create_button(self, text, color):
+        btn = QPushButton(text)
+        btn.setFont(QFont('Arial', 10))
+        btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {color};
+                color: #333333;
+                border-radius: 10px;
+                padding: 8px 15px;
+                border: 1px solid #CCCCCC;
+            }}
+            QPushButton:hover {{
+                background-color: {self.darken_color(color)};
+            }}
+        """)
+        return btn
+
+    def darken_color(self, hex_color, factor=0.8):
+        color = QColor(hex_color)
+        return color.darker(int(100 * factor)).name()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        branches = [Branch.get(name) for name in Branch.get_branch_names()]
+        customers = {self.parent.branch.name: self.parent.booking.customers}
+        rows = timeline_rows(branches, date.today(), self.days.value(), customers)
+        self.view.set_rows(rows, self.days.value() * 24 * 60, date.today())
+
+
+class DashboardScreen(QWidget):
+    def __init__(self, parent):
+        super().__init__()
+        self.parent = parent
+        layout = QVBoxLayout()
+
+        # Set cute background
+        self.setAutoFillBackground(True)
+        palette = self.palette()
+        palette.setColor(QPalette.Window, QColor(255, 245, 238))  # Seashell background
+        self.setPalette(palette)
+
+        title = QLabel("\U0001f4b0 Revenue Dashboard")
+        title.setFont(QFont('Arial', 20))
+        title.setStyleSheet("color: #6B5B95;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+
+        self.total_label = QLabel()
+        self.total_label.setFont(QFont('Arial', 14))
+        self.total_label.setStyleSheet("color: #333333;")
+        self.total_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.total_label)
+
+        tables_layout = QHBoxLayout()
+        self.service_table = self.create_table(["Service", "Bookings", "Revenue"])
+        self.hour_table = self.create_table(["Hour", "Revenue"])
+        tables_layout.addWidget(self.service_table)
+        tables_layout.addWidget(self.hour_table)
+        layout.addLayout(tables_layout)
+
+        self.staff_table = self.create_table(["Staff", "Services", "Revenue", "Work", "Breaks", "Utilization"])
+        layout.addWidget(self.staff_table)
+
+        btn_layout = QHBoxLayout()
+        refresh_btn = self.create_button("Refresh", "#B5EAD7")
+        refresh_btn.clicked.connect(self.refresh)
+        home_btn = self.create_button("Back to Home", "#E2F0CB")
+        home_btn.clicked.connect(lambda: parent.setCurrentIndex(0))
+        btn_layout.addWidget(refresh_btn)
+        btn_layout.addWidget(home_btn)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+
+    def create_table(self, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setStyleSheet("""
+            QTableWidget {
+                background-color: white;
+                border-radius: 5px;
+                border: 1px solid #CCCCCC;
+            }
+            QHeaderView::section {
+                background-color: #B8B8B8;
+                padding: 5px;
+                border-radius: 5px;
+            }
+        """)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def create_button(self, text, color):
+        btn = QPushButton(text)
+        btn.setFont(QFont('Arial', 10))
+        btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {color};
+                color: #333333;
+                border-radius: 10px;
+                padding: 8px 15px;
+                border: 1px solid #CCCCCC;
+            }}
+            QPushButton:hover {{
+                background-color: {self.darken_color(color)};
+            }}
+        """)
+        return btn
+
+    def darken_color(self, hex_color, factor=0.8):
+        color = QColor(hex_color)
+        return color.darker(int(100 * factor)).name()
+
+    def fill_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                table.setItem(row, col, QTableWidgetItem(str(value)))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        totals = self.parent.rollup.totals()
+        self.total_label.setText(f"Bookings: {totals['bookings']}    Revenue: Rs. {totals['revenue']}")
+        self.fill_table(self.service_table, [(name, count, f"Rs. {revenue}")
+                                             for name, (count, revenue) in totals["by_service"].items()])
+        self.fill_table(self.hour_table, [(StaffManager.format_time(hour * 60), f"Rs. {revenue}")
+                                          for hour, revenue in totals["by_hour"].items()])
+        self.fill_table(self.staff_table, [(member, figures["services"], f"Rs. {figures['revenue']}",
+                                            f"{figures['work']} mins", f"{figures['breaks']} mins",
+                                            f"{figures['utilization']:.0%}")
+                                           for member, figures in totals["by_staff"].items()])
+
+
+class GlamStationApp(QStackedWidget):
+    def __init__(self, branch=None, booking_service=None, journal=None, restored_customers=()):
+        super().__init__()
+        self.branch = branch or Branch.get()
+        self.booking_service = booking_service
+        self.journal = journal
+        self.restored_customers = restored_customers
+
+        # Seeded once from whatever is already booked, then kept up to date incrementally
+        self.rollup = RevenueRollup(self.branch.staff.shift_start)
+        for customer in (booking_service.customers if booking_service else restored_customers):
+            self.rollup.record(customer)
+        self.rollup.record_roster(date.today(), self.branch.staff.roster_for_day(date.today()))
+        self.booking_index = BookingIndex(booking_service.customers if booking_service else restored_customers,
+                                          self.branch.staff.shift_start)
+        if booking_service:
+            booking_service.listeners.append(self.rollup.record)
+            booking_service.listeners.append(self.booking_index.add)
+        self.profiles = ProfileCache(self.booking_index.by_customer, self.branch.services)
+        if booking_service:
+            booking_service.listeners.append(self.profiles.refresh)
+
+        self.setWindowTitle(f"GlamStation - {self.branch.name}")
         self.setGeometry(100, 100, 1000, 700)
         self.setStyleSheet("""
             QWidget {
@@ -1062,16 +3627,54 @@ class GlamStationApp(QStackedWidget):
         self.booking = BookingScreen(self)
         self.service = ServiceScreen(self)
         self.staff = StaffSchedulingScreen(self)
+        self.timeline = TimelineScreen(self)
+        self.dashboard = DashboardScreen(self)
 
         self.addWidget(self.home)
         self.addWidget(self.booking)
         self.addWidget(self.service)
         self.addWidget(self.staff)
+        self.addWidget(self.timeline)
+        self.addWidget(self.dashboard)
         self.setCurrentIndex(0)
 
 
 if __name__ == '__main__':
+    if '--harness' in sys.argv:
+        # Differential benchmark: reference vs alternative engines, JSON report
+        report = PerfHarness().write_report(sys.argv[sys.argv.index('--harness') + 1])
+        for result in report["results"]:
+            ratios = "  ".join(f"x{result[key]:.2f} {label}" if result[key] is not None else f"- {label}"
+                               for key, label in (("time_ratio", "time"), ("memory_ratio", "memory")))
+            print(f"{result['task']:<20} {result['engine']:<12} {result['size']:>6}  "
+                  f"{'ok' if result['equivalent'] else 'MISMATCH':<8} {result['seconds'] * 1000:9.2f} ms  {ratios}")
+        sys.exit(0 if all(result["equivalent"] for result in report["results"]) else 1)
+
+    branch, journal, customers = Branch.get(), None, []
+    if '--journal' in sys.argv:
+        # Reload everything recorded before a crash or restart
+        journal = BookingJournal(sys.argv[sys.argv.index('--journal') + 1])
+        restored = journal.restore()
+        if restored:
+            branch, customers = restored
+        else:
+            journal.compact(branch, customers)  # record the starting catalogue and staff
+
+    if '--close-day' in sys.argv:
+        # Headless end-of-day run: write invoices and ledger, then exit
+        # (no QApplication, so it works without a display)
+        for result in close_branches([(branch, customers)], sys.argv[sys.argv.index('--close-day') + 1]):
+            print(json.dumps(result))
+        if journal:
+            journal.close()
+        sys.exit(0)
+
     app = QApplication(sys.argv)
-    window = GlamStationApp()
+    booking_service = None
+    if '--serve' in sys.argv:
+        # Accept bookings from other front-desk terminals on localhost
+        booking_service = BookingService(branch, journal=journal, customers=customers)
+        booking_service.start_in_thread()
+    window = GlamStationApp(branch, booking_service, journal, customers)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,100 @@
+import os
+import random
+import sys
+from datetime import date
+
+import pytest
+
+pytest.importorskip("PyQt5")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from glamStation import AppointmentPacker, Branch, Customer  # noqa: E402
+
+DAY = date(2024, 3, 4)
+SERVICES = {
+    "Blow Dry": {"cost": 700, "duration": 25, "priority": 3},
+    "Hair Colour": {"cost": 3500, "duration": 120, "priority": 2},
+    "Party Makeup": {"cost": 2500, "duration": 60, "priority": 2},
+    "Bridal Makeup": {"cost": 5000, "duration": 180, "priority": 1},
+    "Arm Mehndi": {"cost": 1200, "duration": 45, "priority": 2},
+    "Foot Spa": {"cost": 900, "duration": 40, "priority": 3},
+}
+ROLES = {
+    "Blow Dry": "Hair Stylist",
+    "Hair Colour": "Hair Stylist",
+    "Party Makeup": "Makeup Artist",
+    "Bridal Makeup": "Makeup Artist",
+    "Arm Mehndi": "Mehndi Artist",
+    "Foot Spa": "Pedicurist",  # nobody on staff does this
+}
+
+
+def random_day(rng, branch, count):
+    return [Customer(f"c{i}", rng.sample(list(SERVICES), rng.randint(1, 3)), rng.randint(0, 480),
+                     service_manager=branch.services)
+            for i in range(count)]
+
+
+def check_placements(packer, customers, result):
+    periods = {member: member_periods for members in packer.staff.values()
+               for member, member_periods in members}
+    by_member, by_customer = {}, {}
+    for customer, service, role, member, start, end in result["placements"]:
+        assert ROLES[service] == role
+        assert end - start == SERVICES[service]["duration"]
+        assert start >= packer.opening + customer.arrival_time
+        # Inside a work period, or overtime after the last one
+        assert any(work_start <= start and end <= work_end for work_start, work_end in periods[member]) \
+            or start >= periods[member][-1][1]
+        by_member.setdefault(member, []).append((start, end))
+        by_customer.setdefault(id(customer), []).append((start, end))
+    for intervals in list(by_member.values()) + list(by_customer.values()):
+        intervals.sort()
+        assert all(end <= next_start for (_, end), (next_start, _) in zip(intervals, intervals[1:]))
+
+    placed = len(result["placements"]) + len(result["unassigned"])
+    assert placed == sum(len(customer.services) for customer in customers)
+    assert all(service == "Foot Spa" for _, service in result["unassigned"])
+    finish = max((end for *_, end in result["placements"]), default=packer.opening)
+    assert result["makespan"] == finish - packer.opening
+
+
+@pytest.fixture
+def branch():
+    branch = Branch.load("PackerTest", SERVICES, service_roles=ROLES)
+    branch.staff.set_shift_settings(540, 8, 0.5, 2)
+    return branch
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_pack_places_every_service_within_the_rules(branch, seed):
+    customers = random_day(random.Random(seed), branch, 25)
+    packer = AppointmentPacker(branch, DAY)
+    result = packer.pack(customers, time_limit=5, seed=seed)
+    check_placements(packer, customers, result)
+    assert result["makespan"] <= result["arrival_order_makespan"]
+    for customer in customers:
+        assert customer.waiting_time == max(0, customer.start_time - customer.arrival_time)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_local_search_never_makes_it_worse(branch, seed):
+    customers = random_day(random.Random(seed), branch, 25)
+    packer = AppointmentPacker(branch, DAY)
+    greedy = packer.pack(customers, local_search=False)
+    searched = packer.pack(customers, time_limit=5, seed=seed)
+    assert (searched["makespan"], searched["idle"]) <= (greedy["makespan"], greedy["idle"])
+
+
+def test_pack_is_repeatable_for_a_seed(branch):
+    customers = random_day(random.Random(7), branch, 25)
+    packer = AppointmentPacker(branch, DAY)
+    first = packer.pack(customers, time_limit=5, seed=3)
+    second = packer.pack(customers, time_limit=5, seed=3)
+    assert [placement[1:] for placement in first["placements"]] == \
+        [placement[1:] for placement in second["placements"]]
+
+
+def test_empty_day(branch):
+    result = AppointmentPacker(branch, DAY).pack([])
+    assert (result["makespan"], result["idle"], result["placements"]) == (0, 0, [])
@@ -0,0 +1,67 @@
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("PyQt5")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from glamStation import BookingIndex  # noqa: E402
+
+NAMES = ["Ayesha", "Aiman", "Ali", "Bilal", "Bushra", "Sana", "Sara", "Zoya"]
+SERVICES = ["Hair Wash", "Haircut", "Manicure", "VIP Facial", "Bridal Makeup", "Mehndi Design"]
+
+
+def booking(name, services, arrival):
+    # The index only reads the name, the services and the arrival
+    return SimpleNamespace(name=name, services=services, arrival_time=arrival)
+
+
+def random_bookings(rng, count):
+    return [booking(rng.choice(NAMES), rng.sample(SERVICES, rng.randint(1, 3)), rng.randint(0, 600))
+            for _ in range(count)]
+
+
+def ids(bookings):
+    return [id(customer) for customer in bookings]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_lookups_match_a_scan_after_adds_and_removes(seed):
+    rng = random.Random(seed)
+    bookings = random_bookings(rng, 60)
+    index = BookingIndex(bookings[:30])
+    live = bookings[:30]
+    for customer in bookings[30:]:
+        index.add(customer)
+        live.append(customer)
+        if rng.random() < 0.4:
+            gone = live.pop(rng.randrange(len(live)))
+            index.remove(gone)
+    index.remove(booking("Nobody", ["Haircut"], 0))  # not indexed; ignored
+    assert len(index) == len(live)
+
+    for name in NAMES:
+        assert ids(index.by_customer(name.upper())) == ids(c for c in live if c.name == name)
+    for prefix in ("a", "Sa", "bu", "x"):
+        expected = sorted(((c.name.lower(), i) for i, c in enumerate(live) if c.name.lower().startswith(prefix.lower())))
+        assert ids(index.by_name(prefix)) == [id(live[i]) for _, i in expected]
+    for service in SERVICES:
+        assert ids(index.by_service(service.lower())) == ids(c for c in live if service in c.services)
+    expected = sorted((c.arrival_time, i) for i, c in enumerate(live) if 60 <= c.arrival_time < 240)
+    assert ids(index.by_arrival(60, 240)) == [id(live[i]) for _, i in expected]
+    assert len(index.by_arrival(0, 600, limit=5)) == min(5, sum(c.arrival_time < 600 for c in live))
+
+
+def test_search_by_name_service_and_clock():
+    bookings = [booking("Sara", ["Haircut"], 0), booking("Sana", ["Manicure"], 45),
+                booking("Hina", ["Hair Wash"], 90), booking("Zoya", ["VIP Facial"], 150)]
+    index = BookingIndex(bookings, opening=9 * 60)
+    assert index.search("  ") == []
+    assert [c.name for c in index.search("sa")] == ["Sana", "Sara"]
+    assert [c.name for c in index.search("hair")] == ["Sara", "Hina"]  # by service, in index order
+    assert [c.name for c in index.search("10:00-12:00")] == ["Hina", "Zoya"]
+    assert [c.name for c in index.search("9:45 - 10:00")] == ["Sana"]
+    assert len(index.search("s", limit=1)) == 1
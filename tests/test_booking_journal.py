@@ -0,0 +1,209 @@
+import asyncio
+import os
+import shutil
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip("PyQt5")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from glamStation import BookingJournal, BookingService, Branch, Customer  # noqa: E402
+
+LONG_SERVICE = "Deluxe Full Body Aromatherapy Massage"
+LONG_CUSTOMER = "Khadija Noor Fatima Zahra Siddiqui Rehman"
+
+
+def make_branch(name="JournalTest"):
+    branch = Branch.load(name)
+    branch.services.add_service(LONG_SERVICE, 4000, 60, 2, "Massage Expert")
+    branch.services.add_service(LONG_SERVICE + " XL", 6000, 90, 1, "Massage Expert")
+    return branch
+
+
+def book(branch, name, services, arrival):
+    return Customer(name, services, arrival, service_manager=branch.services)
+
+
+def replayed(path):
+    journal = BookingJournal(path)
+    try:
+        return journal.state
+    finally:
+        journal.close()
+
+
+def test_round_trip_keeps_long_names(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    branch = make_branch()
+    journal = BookingJournal(path)
+    journal.compact(branch, [])
+    journal.record_booking(book(branch, LONG_CUSTOMER, [LONG_SERVICE, LONG_SERVICE + " XL"], 5))
+    journal.record_booking(book(branch, "Sana", ["Haircut"], 7))
+    journal.record_staff("Massage Expert", "Umaima Darkshan Zainab Hussain Qureshi")
+    journal.close()
+
+    state = replayed(path)
+    assert state["services"][LONG_SERVICE] == {"cost": 4000, "duration": 60, "priority": 2}
+    assert state["services"][LONG_SERVICE + " XL"] == {"cost": 6000, "duration": 90, "priority": 1}
+    assert state["roles"][LONG_SERVICE + " XL"] == "Massage Expert"
+    assert "Umaima Darkshan Zainab Hussain Qureshi" in state["staff"]["Massage Expert"]
+    assert state["bookings"] == [[LONG_CUSTOMER, [LONG_SERVICE, LONG_SERVICE + " XL"], 5, 10000],
+                                 ["Sana", ["Haircut"], 7, 800]]
+
+
+def test_out_of_range_values_are_rejected_without_writing(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    branch = make_branch()
+    journal = BookingJournal(path)
+    journal.compact(branch, [])
+
+    with pytest.raises(ValueError):
+        journal.record_service("Refund", {"cost": -100, "duration": 10, "priority": 3})
+    with pytest.raises(ValueError):
+        journal.record_service("Odd", {"cost": 100, "duration": 10, "priority": -1})
+    journal.record_booking(book(branch, "Hina", ["Manicure"], 3))
+    journal.close()
+
+    state = replayed(path)
+    assert "Refund" not in state["services"] and "Odd" not in state["services"]
+    assert state["bookings"] == [["Hina", ["Manicure"], 3, 300]]
+
+
+def test_compact_then_crash_before_truncate(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    branch = make_branch()
+    journal = BookingJournal(path, group_size=1)
+    journal.compact(branch, [])
+    customers = [book(branch, f"Customer {i}", [LONG_SERVICE], i) for i in range(5)]
+    for customer in customers:
+        journal.record_booking(customer)
+    journal.record_cancel(1)
+    del customers[1]
+    journal.commit()
+
+    # Crash after the snapshot is in place but before the log is truncated
+    shutil.copy(path, path + ".before")
+    journal.compact(branch, customers)
+    journal.close()
+    shutil.copy(path + ".before", path)
+
+    journal = BookingJournal(path)
+    journal.record_booking(book(branch, "After Restart", ["Haircut"], 9))
+    journal.close()
+
+    names = [booking[0] for booking in replayed(path)["bookings"]]
+    assert names == ["Customer 0", "Customer 2", "Customer 3", "Customer 4", "After Restart"]
+
+
+def test_torn_writes_are_dropped(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    branch = make_branch()
+    journal = BookingJournal(path)
+    journal.compact(branch, [])
+    journal.record_booking(book(branch, "Kept", ["Haircut"], 1))
+    journal.record_booking(book(branch, LONG_CUSTOMER, ["Haircut"], 2))
+    journal.close()
+
+    # Lose the long-named booking's own record, leaving only its NAME records
+    os.truncate(path, os.path.getsize(path) - BookingJournal.RECORD.size - 10)
+    journal = BookingJournal(path)
+    journal.record_booking(book(branch, "Next", ["Haircut"], 3))
+    journal.close()
+
+    assert [booking[0] for booking in replayed(path)["bookings"]] == ["Kept", "Next"]
+
+
+def test_concurrent_appends_get_unique_ids(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    branch = make_branch()
+    journal = BookingJournal(path)
+    journal.compact(branch, [])
+
+    def worker(thread):
+        for i in range(200):
+            journal.record_service(f"Service {thread}-{i}", {"cost": i, "duration": 5, "priority": 3})
+            journal.record_booking(book(branch, f"Customer {thread}-{i}", ["Haircut"], i))
+
+    threads = [threading.Thread(target=worker, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.close()
+
+    seqs = [record[5] for record in journal._records(path)]
+    assert len(seqs) == len(set(seqs))
+    state = replayed(path)
+    assert all(state["services"][f"Service {thread}-{i}"]["cost"] == i for thread in range(4) for i in range(200))
+    assert len(state["bookings"]) == 800
+
+
+def test_failed_batch_commit_books_nothing(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    branch = make_branch("JournalBatchTest")
+    journal = BookingJournal(path)
+    journal.compact(branch, [])
+    service = BookingService(branch, journal=journal)
+    commit = journal._commit_locked
+    disk_full = threading.Event()
+
+    def flaky_commit():
+        if disk_full.is_set() and journal._buffer:
+            raise OSError("disk full")
+        commit()
+
+    journal._commit_locked = flaky_commit
+
+    async def run():
+        server = await service.start(port=0)
+        try:
+            await service.submit("Ayesha", [LONG_SERVICE])
+            disk_full.set()
+            failed = await asyncio.gather(service.submit("Bilal", [LONG_SERVICE]),
+                                          service.submit("Sana", [LONG_SERVICE]), return_exceptions=True)
+            assert all(isinstance(error, OSError) for error in failed)
+            assert [customer.name for customer in service.customers] == ["Ayesha"]
+            assert service._queue_end == 60
+            assert not journal._buffer
+            disk_full.clear()
+            _, entry = await service.submit("Hina", [LONG_SERVICE])
+            assert entry["id"] == 1 and entry["start"] == 60
+        finally:
+            server.close()
+
+    asyncio.run(run())
+    journal.close()
+    assert [booking[0] for booking in replayed(path)["bookings"]] == ["Ayesha", "Hina"]
+
+
+def test_cancels_from_another_thread_replay_to_the_same_bookings(tmp_path):
+    path = str(tmp_path / "bookings.journal")
+    branch = make_branch("JournalCancelTest")
+    journal = BookingJournal(path, compact_threshold=8)  # compacts every few batches
+    journal.compact(branch, [])
+    service = BookingService(branch, batch_window=0, journal=journal)
+    service.start_in_thread(port=0)
+
+    def front_desk(desk):
+        for i in range(40):
+            service.submit_threadsafe(f"desk{desk}-{i}", [LONG_SERVICE]).result()
+
+    desks = [threading.Thread(target=front_desk, args=(desk,)) for desk in range(3)]
+    for desk in desks:
+        desk.start()
+    cancelled = 0
+    while any(desk.is_alive() for desk in desks) or cancelled < 40:
+        with service.lock:
+            customer = service.customers[len(service.customers) // 2] if service.customers else None
+        if customer is not None and service.cancel(customer):
+            cancelled += 1
+    for desk in desks:
+        desk.join()
+
+    with service.lock:
+        expected = [customer.name for customer in service.customers]
+    journal.close()
+    assert len(expected) == 120 - cancelled
+    assert [booking[0] for booking in replayed(path)["bookings"]] == expected
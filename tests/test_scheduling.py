@@ -0,0 +1,102 @@
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("PyQt5")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from glamStation import sjf, srtf  # noqa: E402
+
+
+def visit(name, duration, arrival):
+    # sjf/srtf only read the arrival and the total duration
+    return SimpleNamespace(name=name, total_duration=duration, arrival_time=arrival)
+
+
+def random_visits(rng, count=30):
+    return [visit(f"c{i}", rng.randint(1, 90), rng.randint(0, 300)) for i in range(count)]
+
+
+def baseline_sjf(customers, aging):
+    # Picks the smallest aged burst among the arrived customers every time the chair frees up
+    pending = sorted(customers, key=lambda x: x.arrival_time)
+    time, order = 0, []
+    while pending:
+        time = max(time, pending[0].arrival_time)
+        arrived = [c for c in pending if c.arrival_time <= time]
+        chosen = min(arrived, key=lambda c: (c.total_duration - aging * (time - c.arrival_time), pending.index(c)))
+        pending.remove(chosen)
+        order.append((chosen.name, time))
+        time += chosen.total_duration
+    return order
+
+
+def baseline_srtf(customers, aging):
+    # Minute by minute: the arrived customer with the smallest aged remaining time runs
+    pending = sorted(customers, key=lambda x: x.arrival_time)
+    remaining = {c.name: c.total_duration for c in pending}
+    start, end = {}, {}
+    time = 0
+    while len(end) < len(pending):
+        arrived = [c for c in pending if c.arrival_time <= time and c.name not in end]
+        if not arrived:
+            time += 1
+            continue
+        chosen = min(arrived, key=lambda c: (remaining[c.name] - aging * (time - c.arrival_time), pending.index(c)))
+        start.setdefault(chosen.name, time)
+        remaining[chosen.name] -= 1
+        time += 1
+        if remaining[chosen.name] == 0:
+            end[chosen.name] = time
+    return start, end
+
+
+def test_sjf_without_aging_serves_shortest_first():
+    customers = [visit("long", 60, 0), visit("short", 10, 0), visit("mid", 30, 0), visit("late", 5, 200)]
+    served = sjf(customers, aging=0)
+    assert [c.name for c in served] == ["short", "mid", "long", "late"]
+    assert [(c.start_time, c.end_time, c.waiting_time) for c in served] == \
+        [(0, 10, 0), (10, 40, 10), (40, 100, 40), (200, 205, 0)]
+
+
+@pytest.mark.parametrize("aging", [0, 0.25, 0.5, 2])
+@pytest.mark.parametrize("seed", range(50))
+def test_sjf_matches_baseline(seed, aging):
+    customers = random_visits(random.Random(seed))
+    expected = baseline_sjf(customers, aging)
+    assert [(c.name, c.start_time) for c in sjf(customers, aging)] == expected
+
+
+def test_srtf_preempts_on_arrival():
+    customers = [visit("long", 30, 0), visit("short", 5, 5)]
+    served = {c.name: c for c in srtf(customers, aging=0)}
+    assert (served["short"].start_time, served["short"].end_time, served["short"].waiting_time) == (5, 10, 0)
+    assert (served["long"].start_time, served["long"].end_time, served["long"].waiting_time) == (0, 35, 5)
+
+
+@pytest.mark.parametrize("aging", [0, 0.25, 0.5, 2])
+@pytest.mark.parametrize("seed", range(50))
+def test_srtf_matches_baseline(seed, aging):
+    customers = random_visits(random.Random(seed), count=15)
+    start, end = baseline_srtf(customers, aging)
+    for customer in srtf(customers, aging):
+        assert (customer.start_time, customer.end_time) == (start[customer.name], end[customer.name])
+        assert customer.waiting_time == customer.end_time - customer.arrival_time - customer.total_duration
+
+
+@pytest.mark.parametrize("schedule", [sjf, srtf])
+def test_aging_bounds_the_wait_of_a_long_visit(schedule):
+    # A steady stream of short visits starves the long one without aging. With
+    # aging, nobody arriving more than burst / aging minutes later overtakes it.
+    stream = [visit(f"short{i}", 5, 5 * i) for i in range(400)]
+    starved = {c.name: c for c in schedule([visit("long", 60, 0)] + stream, aging=0)}
+    assert starved["long"].start_time > stream[-1].arrival_time
+
+    aging = 0.25
+    served = {c.name: c for c in schedule([visit("long", 60, 0)] + stream, aging=aging)}
+    assert served["long"].start_time <= 60 / aging + 5
+    assert all(served["long"].start_time < served[c.name].start_time
+               for c in stream if c.arrival_time > 60 / aging)
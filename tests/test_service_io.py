@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("PyQt5")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from glamStation import ServiceManager  # noqa: E402
+
+SERVICES = {
+    "Haircut": {"cost": 800, "duration": 6, "priority": 2},
+    "Hair Wash, Deep Conditioning": {"cost": 650, "duration": 15, "priority": 3},
+    'Bridal "Royal" Makeup': {"cost": 25000, "duration": 180, "priority": 1},
+    "Mehndi – Arabic Design": {"cost": 1200, "duration": 45, "priority": 0},
+}
+ROLES = {
+    "Haircut": "Hair Stylist",
+    "Hair Wash, Deep Conditioning": "Hair Stylist",
+    'Bridal "Royal" Makeup': "Makeup Artist",
+    "Mehndi – Arabic Design": "Mehndi Artist",
+}
+
+
+def catalogue(services):
+    snapshot = services.snapshot()
+    return {name: (dict(details), snapshot.get_service_role(name)) for name, details in snapshot.services.items()}
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl", ".json"])
+def test_export_then_import_round_trips(tmp_path, extension):
+    path = str(tmp_path / ("services" + extension))
+    source = ServiceManager(SERVICES, ROLES)
+    assert source.export_services(path) == len(SERVICES)
+
+    target = ServiceManager()
+    report = target.import_services(ServiceManager.read_service_file(path), replace=True)
+    assert catalogue(target) == catalogue(source)
+    assert sorted(report["added"]) == sorted(set(SERVICES) - set(ServiceManager._default_services))
+    assert (report["updated"], report["unchanged"]) == ([], 1)  # Haircut matches the default
+    assert sorted(report["removed"]) == sorted(set(ServiceManager._default_services) - set(SERVICES))
+
+    version = target.snapshot().version
+    again = target.import_services(ServiceManager.read_service_file(path), replace=True)
+    assert again == {"added": [], "updated": [], "removed": [], "unchanged": len(SERVICES)}
+    assert target.snapshot().version == version  # nothing changed, nothing published
+
+
+def test_repeated_name_keeps_its_last_row(tmp_path):
+    path = tmp_path / "services.jsonl"
+    rows = [{"name": "Facial", "cost": 900, "duration": 30},
+            {"name": "Facial", "cost": 1100, "duration": 40, "priority": 1, "role": "Makeup Artist"}]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    services = ServiceManager({}, {})
+    report = services.import_services(ServiceManager.read_service_file(str(path)))
+    assert report["added"] == ["Facial"]
+    assert catalogue(services)["Facial"] == ({"cost": 1100, "duration": 40, "priority": 1}, "Makeup Artist")
+
+
+@pytest.mark.parametrize("row", [{"name": "Facial", "cost": -1, "duration": 30},
+                                 {"name": "Facial", "cost": 900, "duration": 0},
+                                 {"name": "Facial", "cost": 900, "duration": 30, "priority": -2},
+                                 {"name": "Facial", "cost": "free", "duration": 30},
+                                 {"name": " ", "cost": 900, "duration": 30},
+                                 {"cost": 900, "duration": 30}])
+def test_bad_rows_are_rejected(tmp_path, row):
+    path = tmp_path / "services.json"
+    path.write_text(json.dumps([row]), encoding="utf-8")
+    services = ServiceManager({}, {})
+    with pytest.raises(ValueError):
+        services.import_services(ServiceManager.read_service_file(str(path)))
+    assert catalogue(services) == {}
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("PyQt5")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from glamStation import StaffManager, _member_loop_schedule, _roster_schedule  # noqa: E402
+
+
+def random_staff(rng, durations=False):
+    roles = list(StaffManager._default_staff)
+    staff = {role: [f"{role} {i}" for i in range(rng.randint(0, 12))] for role in roles}
+    staff_manager = StaffManager(staff)
+    staff_manager.set_shift_settings(rng.choice((420, 540, 600)), rng.choice((4, 6, 8, 9.5)),
+                                     rng.choice((0.25, 0.5, 1)), rng.choice((1, 2, 3, 4)))
+    for members in staff.values():
+        for member in members:
+            if rng.random() < 0.3:
+                staff_manager.set_member_shift(member, rng.choice((None, 480, 660)),
+                                               rng.choice((None, 3, 5, 10)) if durations else None,
+                                               rng.sample(range(7), rng.randint(0, 3)))
+    return staff_manager, date(2024, 1, 1) + timedelta(days=rng.randrange(7))
+
+
+def test_default_staff_matches_original_loop():
+    staff_manager = StaffManager()
+    day = date(2024, 1, 3)
+    expected = _member_loop_schedule(staff_manager, day)
+    assert _roster_schedule(staff_manager, day) == expected
+    assert staff_manager.generate_schedule(day) == expected
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_roster_and_schedule_match_original_loop(seed):
+    # The original loop only knows one shift length, so members vary start and days off
+    staff_manager, day = random_staff(random.Random(seed))
+    expected = _member_loop_schedule(staff_manager, day)
+    assert _roster_schedule(staff_manager, day) == expected
+    assert staff_manager.generate_schedule(day) == expected
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_roster_and_schedule_agree_with_member_shift_lengths(seed):
+    staff_manager, day = random_staff(random.Random(seed), durations=True)
+    assert staff_manager.generate_schedule(day) == _roster_schedule(staff_manager, day)
+
+
+@pytest.mark.parametrize("settings", [{"breaks_per_shift": 0}, {"breaks_per_shift": 1.5}, {"duration": 0},
+                                      {"duration": 0.01, "breaks_per_shift": 4}, {"start": -60},
+                                      {"break_duration": -0.5}])
+def test_unusable_shift_settings_are_rejected(settings):
+    staff_manager = StaffManager()
+    before = staff_manager.snapshot()
+    with pytest.raises(ValueError):
+        staff_manager.set_shift_settings(**settings)
+    assert staff_manager.snapshot() is before
+    assert staff_manager.generate_schedule(date(2024, 1, 3)) == _roster_schedule(staff_manager, date(2024, 1, 3))
+
+
+def test_member_shift_overrides_must_fit_the_breaks():
+    staff_manager = StaffManager()
+    staff_manager.set_shift_settings(breaks_per_shift=2)
+    with pytest.raises(ValueError):
+        staff_manager.set_member_shift("Sara", duration=0)
+    staff_manager.set_member_shift("Sara", duration=0.05)  # 3 minutes: one per work period
+    with pytest.raises(ValueError):
+        staff_manager.set_shift_settings(breaks_per_shift=3)
+    assert staff_manager.snapshot().breaks_per_shift == 2